@@ -0,0 +1,70 @@
+"""
+번역 배치 구성 비교: 기존 글자 수 기준(len + 10 ≤ 4000) vs 토큰 기준 + 문서 내 중복 제거
+
+    python -m benchmarks.bench_batching [행 수]
+
+배치 수(=API 호출 수)와 배치별 입력/예상 출력 토큰 최대값을 출력한다. 토큰 수는 utils/token_count.py 기준
+(tiktoken이 없으면 추정치).
+"""
+import sys
+import math
+
+from utils import translate_gpt_client as tc
+from utils.token_count import TOKENIZER_LOAD_TIMEOUT_SEC, count_tokens, tokenizer_name, warm_tokenizer
+
+PURPOSES = ("소유권보존", "소유권이전", "근저당권설정", "근저당권말소", "전세권설정", "가압류")
+CAUSES = ("2019년3월4일 매매", "2020년7월1일 설정계약", "2021년1월15일 해지", "2022년9월30일 상속")
+OWNERS = ("김가영 金佳英", "이민준 李敏俊", "박서연 朴書妍", "최도윤 崔道允")
+
+
+def make_document(rows: int) -> dict:
+    # 등기부 갑구/을구처럼 같은 목적/원인/권리자가 반복되는 문서
+    return {
+        "documentType": "부동산등기부등본",
+        "address": "서울특별시 용산구 청파로47길 100 숙명여자대학교",
+        "rows": [{
+            "rank": str(i + 1),
+            "purpose": PURPOSES[i % len(PURPOSES)],
+            "receipt": f"2023년{i % 12 + 1}월{i % 28 + 1}일 제{1000 + i}호",
+            "cause": CAUSES[i % len(CAUSES)],
+            "holder": f"소유자 {OWNERS[i % len(OWNERS)]} 서울특별시 용산구 청파로 {i % 50 + 1}",
+            "note": "부동산등기법 제177조의6 제1항의 규정에 의하여 전산이기" if i % 3 == 0 else "",
+        } for i in range(rows)],
+    }
+
+
+def legacy_batches(items: list, max_chars: int = 4000) -> list:
+    batches, cur, cur_len = [], [], 0
+    for it in items:
+        add = len(it[1]) + 10
+        if cur and cur_len + add > max_chars:
+            batches.append(cur)
+            cur, cur_len = [], 0
+        cur.append(it)
+        cur_len += add
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def describe(name: str, batches: list) -> None:
+    ins = [sum(count_tokens(v) + 3 for _, v in b) for b in batches]
+    outs = [sum(math.ceil(count_tokens(v) * tc.OUTPUT_TOKEN_RATIO) + 3 for _, v in b) for b in batches]
+    over = sum(o > tc.MAX_OUTPUT_TOKENS for o in outs)
+    print(f"{name:<22} {len(batches):>7} {sum(len(b) for b in batches):>7} {max(ins):>10} {max(outs):>11} {over:>9}")
+
+
+def main(rows: int = 300) -> None:
+    warm_tokenizer().join(TOKENIZER_LOAD_TIMEOUT_SEC)
+    pairs = tc._collect_strings(make_document(rows))
+    unique = list(dict.fromkeys(v for _, v in pairs))
+    print(f"tokenizer={tokenizer_name()} rows={rows} values={len(pairs)} unique={len(unique)} "
+          f"budget in={tc.MAX_INPUT_TOKENS} out={tc.MAX_OUTPUT_TOKENS} ratio={tc.OUTPUT_TOKEN_RATIO}")
+    print(f"{'packing':<22} {'batches':>7} {'values':>7} {'max in tok':>10} {'max out tok':>11} {'over out':>9}")
+    describe("chars (legacy)", legacy_batches(pairs))
+    describe("tokens", tc._make_batches(pairs))
+    describe("tokens + dedup", tc._make_batches([(v, v) for v in unique]))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
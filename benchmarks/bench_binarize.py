@@ -0,0 +1,84 @@
+"""
+이진화 전처리 비교: 방식별 처리 시간(ms/MP)과 음영이 있는 합성 페이지에서의 글자 보존율
+
+    python -m benchmarks.bench_binarize [반복 횟수]
+"""
+import sys
+import time
+import statistics
+
+import cv2
+import numpy as np
+
+from utils import image_processing as ip
+
+METHODS = ("global", "otsu", "adaptive", "sauvola")
+
+
+def make_page(h: int = 3508, w: int = 2480, skew: float = 2.5) -> tuple:
+    """(촬영본 흉내 그레이스케일, 글자 마스크) — 왼쪽 위에서 오른쪽 아래로 어두워지는 음영 + 기울기 + 검은 테두리"""
+    ink = np.zeros((h, w), np.uint8)
+    for i in range(45):
+        y = 220 + i * 70
+        cv2.putText(ink, f"{i:02d} SEOUL YONGSAN-GU CHEONGPA-RO 47 53-12 REGISTRY", (160, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, 255, 3)
+        if i % 5 == 0:
+            cv2.line(ink, (120, y + 20), (w - 120, y + 20), 255, 3)
+
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    paper = 245 - 120 * (xx / w + yy / h) / 2  # 245 → 125
+    page = np.where(ink > 0, paper * 0.35, paper)
+    page += np.random.default_rng(0).normal(0, 6, page.shape)
+    page = np.clip(page, 0, 255).astype(np.uint8)
+
+    m = cv2.getRotationMatrix2D((w / 2, h / 2), skew, 1.0)
+    page = cv2.warpAffine(page, m, (w, h), borderValue=255)
+    ink = cv2.warpAffine(ink, m, (w, h), flags=cv2.INTER_NEAREST)
+    page[:60], page[-60:], page[:, :50], page[:, -50:] = 20, 20, 20, 20
+    return page, ink > 0
+
+
+def _ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main(n: int = 5) -> None:
+    page, ink = make_page()
+    mp = page.size / 1e6
+    inner = (slice(80, -80), slice(70, -70))  # 테두리 제외 영역에서 품질 측정
+    # 기울기는 preprocess와 같게 테두리를 잘라낸 뒤 추정, 되돌린 결과를 다시 재서 0 근처인지 확인
+    small, _ = ip._downscale(page)
+    ink_small = ip._ink(small)
+    r0, r1, c0, c1 = ip._border_bounds(ink_small)
+    skew = ip._estimate_skew(ink_small[r0:r1, c0:c1])
+    deskewed = ip.preprocess(page, "부동산등기부등본")
+    residual = ip._estimate_skew(ip._ink(ip._downscale(deskewed)[0]))
+    print(f"page {page.shape[1]}x{page.shape[0]} ({mp:.1f} MP), skew estimate {skew:+.2f} deg (page rotated +2.50), "
+          f"after deskew {residual:+.2f} deg")
+    print(f"{'method':<10} {'threshold ms/MP':>16} {'full ms/MP':>11} {'ink recall':>11} {'false ink':>10}")
+    for method in METHODS:
+        profile = dict(ip.DEFAULT_BINARIZE_PROFILE, method=method)
+        thr = _ms(lambda: ip._threshold(page, profile), n) / mp
+
+        ip.BINARIZE_PROFILES["_bench"] = dict(profile, denoise=True)
+        full = _ms(lambda: ip.preprocess(page, "_bench"), n) / mp
+
+        binary = ip._threshold(page, profile)[inner] == 0
+        truth = ink[inner]
+        recall = (binary & truth).sum() / truth.sum()
+        false_ink = (binary & ~truth).sum() / (~truth).sum()
+        print(f"{method:<10} {thr:>16.2f} {full:>11.2f} {recall:>11.3f} {false_ink:>10.3f}")
+    ip.BINARIZE_PROFILES.pop("_bench", None)
+
+    legacy = cv2.imencode(".png", ip._threshold(page, {"method": "global"}))[1].nbytes
+    current = len(ip.binarize_image_bytes(cv2.imencode(".png", page)[1].tobytes(), "부동산등기부등본"))
+    print(f"PNG size: legacy global-200 {legacy / 1024:.0f} KB → 부동산등기부등본 profile (1-bit) {current / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
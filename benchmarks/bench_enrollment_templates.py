@@ -0,0 +1,65 @@
+"""
+재학증명서 생성 지연시간 비교: 매 요청 Document(템플릿 경로) vs 템플릿 레지스트리 복제
+
+    python -m benchmarks.bench_enrollment_templates [반복 횟수]
+"""
+import io
+import sys
+import json
+import time
+import tempfile
+import statistics
+
+from docx import Document
+
+from utils.generate_doc import template_registry
+from utils.generate_doc.generate_enrollment_certificate_docx import (
+    generate_enrollment_certificate_docx, replace_in_runs, _normalize_replacements,
+)
+
+SAMPLE = {
+    "authenticationNo": "2025-0001", "receiver": "제출처", "use": "제출용",
+    "fullName": "김가영", "dateOfBirth": "2000-08-12", "major": "컴퓨터과학전공",
+    "grade": "3", "dateOfIssue": "2025-07-18", "universityName": "숙명여자대학교",
+    "authorizedOfficer": "총장", "content": "위의 사실을 증명함",
+}
+
+
+def _legacy(json_path: str, lang: str) -> Document:
+    # 레지스트리 도입 전 방식: 요청마다 템플릿 파일을 열어서 파싱
+    with open(json_path, "r", encoding="utf-8") as f:
+        replacements = _normalize_replacements(json.load(f))
+    doc = Document(template_registry.enrollment_template_path(lang))
+    replace_in_runs(doc.paragraphs, replacements)
+    for section in doc.sections:
+        replace_in_runs(section.header.paragraphs, replacements)
+    return doc
+
+
+def _measure(fn, json_path: str, lang: str, n: int) -> list:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        doc = fn(json_path, lang)
+        doc.save(io.BytesIO())
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main(n: int = 50) -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(SAMPLE, f, ensure_ascii=False)
+        json_path = f.name
+
+    template_registry.preload_templates()
+    print(f"{'lang':<6} {'before p50':>11} {'after p50':>10} {'before p95':>11} {'after p95':>10}  (ms, n={n})")
+    for lang in template_registry.ENROLLMENT_TEMPLATES:
+        before = sorted(_measure(_legacy, json_path, lang, n))
+        after = sorted(_measure(generate_enrollment_certificate_docx, json_path, lang, n))
+        p95 = max(0, int(n * 0.95) - 1)
+        print(f"{lang:<6} {statistics.median(before):>11.2f} {statistics.median(after):>10.2f} "
+              f"{before[p95]:>11.2f} {after[p95]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
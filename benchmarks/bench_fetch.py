@@ -0,0 +1,97 @@
+"""
+원격 이미지 가져오기: 로컬 이미지 호스트 / S3 대역 서버로 캐시 효과 측정
+
+    python -m benchmarks.bench_fetch --pages 10 --size-mb 4
+
+단계: cold(처음) → warm(조건부 요청, 304만) → trust(확인 요청도 생략) → changed(내용 바뀜) → evict(용량 제한)
+S3 쪽은 S3_MULTIPART_CHUNKSIZE를 작게 잡아 범위 병렬 다운로드까지 거친다.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_servers import MockConfig, create_image_host_app, create_s3_app, start_server, stop_server
+
+
+def run_phase(name: str, fetch, urls: list, expected: dict, config: MockConfig, concurrency: int) -> None:
+    before = dict(config.counts)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, urls))
+    elapsed = (time.perf_counter() - t0) * 1000
+    for url, (_, data) in zip(urls, results):
+        assert data == expected[url], f"내용 불일치: {url}"
+    delta = {k: config.counts[k] - before.get(k, 0) for k in ("object_body", "object_304", "object_head")}
+    print(f"  {name:<8} {elapsed:>9.1f} ms   bodies={delta['object_body']:<4} "
+          f"304={delta['object_304']:<4} head={delta['object_head']}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="원격 이미지 캐시 벤치마크")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--size-mb", type=float, default=4.0, help="이미지 하나 크기")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    size = int(args.size_mb * 1024 * 1024)
+    names = [f"page{i + 1}.jpg" for i in range(args.pages)]
+    objects = {n: os.urandom(size) for n in names}
+    buckets = {"lingo-bench": {f"uploads/{n}": data for n, data in objects.items()}}
+
+    config = MockConfig()
+    host_server, host_port = start_server(create_image_host_app(config, objects))
+    s3_server, s3_port = start_server(create_s3_app(config, buckets))
+
+    workdir = tempfile.mkdtemp(prefix="lingo-fetch-")
+    # 모듈이 import 시점에 환경변수를 읽으므로 먼저 설정
+    os.environ.update({
+        "S3_ENDPOINT_URL": f"http://127.0.0.1:{s3_port}",
+        "AWS_ACCESS_KEY_ID": "bench", "AWS_SECRET_ACCESS_KEY": "bench", "AWS_DEFAULT_REGION": "us-east-1",
+        "S3_MULTIPART_CHUNKSIZE": str(1024 * 1024),
+        "OBJECT_CACHE_DIR": os.path.join(workdir, "objects"),
+        "OBJECT_CACHE_TRUST_SEC": "0",
+    })
+    downloader = importlib.import_module("utils.s3_http_downloader")
+    cache = importlib.import_module("utils.object_cache").get_object_cache()
+
+    sources = {
+        "http": {f"http://127.0.0.1:{host_port}/images/{n}": n for n in names},
+        "s3": {f"s3://lingo-bench/uploads/{n}": n for n in names},
+    }
+    print(f"pages={args.pages} size={args.size_mb}MB concurrency={args.concurrency}")
+    try:
+        for source, url_names in sources.items():
+            urls = list(url_names)
+            expected = {u: objects[n] for u, n in url_names.items()}
+            print(f"\n== {source}")
+            run_phase("cold", downloader.fetch_bytes, urls, expected, config, args.concurrency)
+            run_phase("warm", downloader.fetch_bytes, urls, expected, config, args.concurrency)
+
+            cache.trust_sec = 3600
+            run_phase("trust", downloader.fetch_bytes, urls, expected, config, args.concurrency)
+            cache.trust_sec = 0
+
+            # 첫 페이지 내용이 바뀌면 그 페이지만 다시 받는다
+            objects[names[0]] = os.urandom(size)
+            buckets["lingo-bench"][f"uploads/{names[0]}"] = objects[names[0]]
+            expected = {u: objects[n] for u, n in url_names.items()}
+            run_phase("changed", downloader.fetch_bytes, urls, expected, config, args.concurrency)
+
+        cache.max_bytes = size * 3
+        freed = cache.evict()
+        print(f"\nevict to {cache.max_bytes // (1024 * 1024)}MB budget: freed {freed / 1024 / 1024:.0f}MB, "
+              f"remaining {cache.stats()['bytes'] / 1024 / 1024:.0f}MB")
+        print(f"cache stats: {cache.stats()}")
+    finally:
+        for server in (host_server, s3_server):
+            stop_server(server)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+오프라인 부하 테스트: 가짜 CLOVA OCR / OpenAI 서버를 띄우고 API를 동시 호출해서 단계별 지연시간을 잰다
+
+    python -m benchmarks.bench_load --requests 40 --concurrency 8 --pages 3
+    python -m benchmarks.bench_load --scenarios translate --gpt-latency 0.5 --rate-429 0.1
+
+단계별 시간은 응답의 Server-Timing 헤더(download/binarize/ocr/gpt/translate/...)에서 모은다.
+작업 디렉터리는 임시 폴더라서 outputs/ 가 저장소에 쌓이지 않는다 (--keep-workdir로 남길 수 있음).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import shutil
+import argparse
+import tempfile
+import importlib
+
+import cv2
+import httpx
+import numpy as np
+
+from benchmarks.mock_servers import (
+    STRUCTURED_RESULT, MockConfig, create_ocr_app, create_openai_app, start_server, stop_server,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("ocr", "vision", "translate", "generate")
+
+SAMPLE = {
+    "authenticationNo": "2025-0001", "receiver": "제출처", "use": "제출용",
+    "fullName": "김가영", "dateOfBirth": "2000-08-12", "major": "컴퓨터과학전공",
+    "grade": "3", "dateOfIssue": "2025-07-18", "universityName": "숙명여자대학교",
+    "authorizedOfficer": "총장", "content": "위의 사실을 증명함",
+}
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def parse_server_timing(header: str) -> dict:
+    """'ocr;dur=12.3;desc="x3", total;dur=40' → {"ocr": 12.3, "total": 40.0}"""
+    out = {}
+    for entry in (header or "").split(","):
+        fields = [f.strip() for f in entry.split(";")]
+        if not fields[0]:
+            continue
+        for f in fields[1:]:
+            if f.startswith("dur="):
+                out[fields[0]] = float(f[4:])
+    return out
+
+
+def make_pages(out_dir: str, n: int) -> list:
+    # A4 300dpi 스캔 크기의 글자 페이지
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    rng = np.random.default_rng(0)
+    for i in range(n):
+        img = np.full((3508, 2480), 235, np.uint8)
+        img += rng.integers(0, 15, img.shape, dtype=np.uint8)
+        for line in range(40):
+            cv2.putText(img, f"PAGE {i + 1} LINE {line:02d} REGISTRY 53-12", (150, 200 + line * 80),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.6, 30, 3)
+        path = os.path.join(out_dir, f"page{i + 1}.jpg")
+        cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        paths.append(path)
+    return paths
+
+
+def build_requests(scenario: str, pages: list, translate_json: str) -> tuple:
+    if scenario == "ocr":
+        return "/binarize-and-ocr-multi", {"image_paths": pages, "doc_type": "부동산등기부등본"}
+    if scenario == "vision":
+        return "/binarize-and-ocr-multi", {"image_paths": pages, "doc_type": "재학증명서"}
+    if scenario == "translate":
+        return "/translate", {"json_path": translate_json, "lang": "영어"}
+    if scenario == "generate":
+        return "/generate-doc", {"doc_type": "재학증명서", "lang": "영어", "editedContentJson": SAMPLE}
+    raise ValueError(scenario)
+
+
+async def drive(base_url: str, path: str, payload: dict, n: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies, stages, errors = [], {}, {}
+
+    async def one(client):
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post(path, json=payload)
+                status = resp.status_code
+            except httpx.HTTPError as e:
+                status, resp = type(e).__name__, None
+            elapsed = (time.perf_counter() - t0) * 1000
+        if status != 200:
+            errors[status] = errors.get(status, 0) + 1
+            return
+        latencies.append(elapsed)
+        for stage, dur in parse_server_timing(resp.headers.get("server-timing")).items():
+            stages.setdefault(stage, []).append(dur)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(n)))
+        wall = time.perf_counter() - t0
+    return {"latencies": latencies, "stages": stages, "errors": errors, "wall": wall}
+
+
+def report(name: str, result: dict, n: int) -> None:
+    ok = len(result["latencies"])
+    print(f"\n== {name}: {ok}/{n} ok, errors={result['errors'] or 0}, "
+          f"{ok / result['wall']:.2f} req/s (wall {result['wall']:.1f}s)")
+    print(f"  {'stage':<20} {'p50':>9} {'p95':>9} {'p99':>9}   (ms)")
+    rows = [("client", result["latencies"])] + sorted(result["stages"].items(), key=lambda kv: kv[0] == "total")
+    for stage, values in rows:
+        print(f"  {stage:<20} {percentile(values, 50):>9.1f} {percentile(values, 95):>9.1f} "
+              f"{percentile(values, 99):>9.1f}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="가짜 OCR/GPT 서버 기반 부하 테스트")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"쉼표 구분: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=20, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=3, help="구조화 요청당 페이지 수")
+    parser.add_argument("--ocr-latency", type=float, default=0.3, help="초")
+    parser.add_argument("--gpt-latency", type=float, default=1.0, help="초")
+    parser.add_argument("--jitter", type=float, default=0.3, help="지연시간 ±비율")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="chat completions 429 비율")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="OCR/chat completions 503 비율")
+    parser.add_argument("--rate-truncate", type=float, default=0.0, help="번역 응답을 중간에서 자르는 비율")
+    parser.add_argument("--rate-mismatch", type=float, default=0.0, help="번역 응답 값 개수를 어긋나게 하는 비율")
+    parser.add_argument("--cache", action="store_true", help="결과 캐시/번역 메모리 사용 (기본은 끔)")
+    parser.add_argument("--keep-workdir", action="store_true", help="끝난 뒤 임시 작업 디렉터리를 남김")
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    config = MockConfig(args.ocr_latency, args.gpt_latency, args.jitter, args.rate_429, args.rate_5xx,
+                        args.rate_truncate, args.rate_mismatch)
+    ocr_server, ocr_port = start_server(create_ocr_app(config))
+    gpt_server, gpt_port = start_server(create_openai_app(config))
+
+    workdir = tempfile.mkdtemp(prefix="lingo-bench-")
+    os.symlink(os.path.join(REPO_ROOT, "templates"), os.path.join(workdir, "templates"))
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_ROOT)
+
+    # 앱 모듈은 import 시점에 환경변수를 읽으므로 먼저 설정
+    os.environ.update({
+        "INVOKE_URL": f"http://127.0.0.1:{ocr_port}/ocr/general",
+        "X_OCR_SECRET": "bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{gpt_port}/v1",
+        "OPENAI_API_KEY": "bench",
+        "RESULT_CACHE_ENABLED": "1" if args.cache else "0",
+        "TRANSLATE_USE_MEMORY": "1" if args.cache else "0",
+        "RETENTION_ENABLED": "0",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+    app_module = importlib.import_module("main")
+    app_server, app_port = start_server(app_module.app)
+    base_url = f"http://127.0.0.1:{app_port}"
+
+    pages = make_pages(os.path.join(workdir, "pages"), args.pages)
+    translate_json = os.path.join(workdir, "translate_input.json")
+    with open(translate_json, "w", encoding="utf-8") as f:
+        json.dump(STRUCTURED_RESULT, f, ensure_ascii=False)
+
+    print(f"workdir={workdir} requests={args.requests} concurrency={args.concurrency} pages={args.pages} "
+          f"ocr={args.ocr_latency}s gpt={args.gpt_latency}s 429={args.rate_429} 5xx={args.rate_5xx}")
+    try:
+        for name in scenarios:
+            path, payload = build_requests(name, pages, translate_json)
+            result = asyncio.run(drive(base_url, path, payload, args.requests, args.concurrency))
+            report(name, result, args.requests)
+        print(f"\nmock upstream calls: {config.counts}")
+    finally:
+        for server in (app_server, ocr_server, gpt_server):
+            stop_server(server)
+        if not args.keep_workdir:
+            os.chdir(REPO_ROOT)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+플레이스홀더 치환 비교: 키마다 re.sub 하던 방식 vs 단일 패스 엔진(utils.generate_doc.placeholder)
+
+    python -m benchmarks.bench_placeholder [문단 수] [키 수] [반복 횟수]
+"""
+import re
+import sys
+import time
+import statistics
+
+from docx import Document
+
+from utils.generate_doc.placeholder import has_drawing, render_document
+
+
+def _legacy_paragraphs(paragraphs, replacements: dict) -> None:
+    # 엔진 도입 전 방식: 모든 문단을 다시 쓰고, 문단마다 키 수만큼 re.sub
+    for para in paragraphs:
+        if not para.runs:
+            continue
+        text_runs, drawing_runs = [], []
+        for run in para.runs:
+            (drawing_runs if has_drawing(run) else text_runs).append(run)
+        buffer = "".join(r.text for r in text_runs)
+        for key, val in replacements.items():
+            pattern = r"\{\{\s*" + re.escape(str(key)) + r"\s*\}\}"
+            buffer = re.sub(pattern, "" if val is None else str(val), buffer)
+        for run in text_runs:
+            para._element.remove(run._element)
+        if text_runs:
+            first = text_runs[0]
+            new_run = para.add_run(buffer)
+            new_run.style = first.style
+            new_run.font.size = first.font.size
+            new_run.bold = first.bold
+            new_run.italic = first.italic
+            new_run.underline = first.underline
+        for run in drawing_runs:
+            para._element.append(run._element)
+
+
+def _legacy(doc, replacements: dict) -> None:
+    _legacy_paragraphs(doc.paragraphs, replacements)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                _legacy_paragraphs(cell.paragraphs, replacements)
+    for section in doc.sections:
+        _legacy_paragraphs(section.header.paragraphs, replacements)
+
+
+def _build(n_paragraphs: int, n_keys: int) -> Document:
+    # 문단 4개 중 1개만 플레이스홀더를 포함 (실제 템플릿과 비슷한 비율)
+    doc = Document()
+    for i in range(n_paragraphs):
+        p = doc.add_paragraph()
+        if i % 4 == 0:
+            p.add_run("항목 ")
+            p.add_run("{{ key%d }}" % (i % n_keys))
+            p.add_run(" / {{key%d}}" % ((i + 1) % n_keys))
+        else:
+            p.add_run("고정 문구 %d " % i)
+            p.add_run("서식이 다른 run")
+    table = doc.add_table(rows=n_paragraphs // 20 or 1, cols=2)
+    for r, row in enumerate(table.rows):
+        row.cells[0].text = "라벨 %d" % r
+        row.cells[1].text = "{{ key%d }}" % (r % n_keys)
+    doc.sections[0].header.paragraphs[0].text = "{{ key0 }}"
+    return doc
+
+
+def _measure(fn, n_paragraphs: int, n_keys: int, replacements: dict, n: int) -> list:
+    samples = []
+    for _ in range(n):
+        doc = _build(n_paragraphs, n_keys)
+        t0 = time.perf_counter()
+        fn(doc, replacements)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _texts(doc) -> list:
+    out = [p.text for p in doc.paragraphs]
+    for table in doc.tables:
+        out += [cell.text for row in table.rows for cell in row.cells]
+    out += [p.text for s in doc.sections for p in s.header.paragraphs]
+    return out
+
+
+def main(n_paragraphs: int = 400, n_keys: int = 40, n: int = 10) -> None:
+    replacements = {f"key{i}": f"값{i}" for i in range(n_keys)}
+
+    a, b = _build(n_paragraphs, n_keys), _build(n_paragraphs, n_keys)
+    _legacy(a, replacements)
+    render_document(b, replacements)
+    assert _texts(a) == _texts(b), "치환 결과가 다릅니다"
+
+    before = sorted(_measure(_legacy, n_paragraphs, n_keys, replacements, n))
+    after = sorted(_measure(render_document, n_paragraphs, n_keys, replacements, n))
+    print(f"paragraphs={n_paragraphs} keys={n_keys} n={n}")
+    print(f"per-key re.sub  p50 {statistics.median(before):8.2f} ms")
+    print(f"single-pass     p50 {statistics.median(after):8.2f} ms  (x{statistics.median(before) / statistics.median(after):.1f})")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
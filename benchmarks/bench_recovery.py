@@ -0,0 +1,83 @@
+"""
+번역 배치 복구 단계 확인: 가짜 OpenAI 서버로 응답 오류를 만들어 호출 수와 결과를 본다
+
+    python -m benchmarks.bench_recovery --values 64
+
+- faults: 잘린 JSON/값 개수 불일치 → 살리거나 나눠서 재요청, 모든 값이 번역돼야 한다
+- context: 값이 많으면 400 context_length_exceeded → 나눠서 재요청, 모든 값이 번역돼야 한다
+- config 400: 모델명 오류 같은 400 → 나누지 않고 한 번에 BadRequestError로 올라와야 한다
+하나라도 기대와 다르면 종료 코드 1.
+"""
+import os
+import sys
+import time
+import argparse
+import importlib
+
+from benchmarks.mock_servers import MockConfig, create_openai_app, start_server, stop_server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="번역 배치 복구 확인")
+    parser.add_argument("--values", type=int, default=64, help="한 배치의 값 수")
+    parser.add_argument("--rate-truncate", type=float, default=0.3)
+    parser.add_argument("--rate-mismatch", type=float, default=0.3)
+    parser.add_argument("--max-values", type=int, default=16, help="context 단계에서 한 요청에 허용하는 값 수")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(gpt_latency=0.02, jitter=0)
+    server, port = start_server(create_openai_app(config))
+    # 모듈이 import 시점에 환경변수를 읽으므로 먼저 설정
+    os.environ.update({"OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1", "OPENAI_API_KEY": "bench",
+                       "TRANSLATE_USE_MEMORY": "0"})
+    tc = importlib.import_module("utils.translate_gpt_client")
+    openai = importlib.import_module("openai")
+
+    values = [f"기재사항 {i} 소유권이전" for i in range(args.values)]
+    expected = [f"[tr] {v}" for v in values]
+    failed = []
+
+    def phase(name: str, **faults) -> tuple:
+        for key, value in faults.items():
+            setattr(config, key, value)
+        before = dict(config.counts)
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            out = tc._translate_batch(values, "영어")
+            untranslated = sum(o == v for o, v in zip(out, values))
+            if out != expected:
+                outcome = f"FAIL ({untranslated} untranslated)"
+        except openai.BadRequestError as e:
+            outcome = f"BadRequestError {getattr(e, 'code', '')}"
+        elapsed = (time.perf_counter() - t0) * 1000
+        delta = {k: config.counts[k] - before.get(k, 0) for k in ("chat", "truncated", "mismatch", "400")}
+        print(f"  {name:<10} {elapsed:>8.1f} ms   calls={delta['chat']:<4} truncated={delta['truncated']:<3} "
+              f"mismatch={delta['mismatch']:<3} 400={delta['400']:<3} {outcome}")
+        for key in faults:
+            setattr(config, key, 0)
+        return outcome, delta
+
+    print(f"values={args.values}")
+    try:
+        outcome, _ = phase("faults", rate_truncate=args.rate_truncate, rate_mismatch=args.rate_mismatch)
+        if outcome != "ok":
+            failed.append("faults")
+        outcome, _ = phase("context", max_values=args.max_values)
+        if outcome != "ok":
+            failed.append("context")
+        # 설정 오류 400은 나누지 않고 바로 올라와야 한다 (호출 1번)
+        outcome, delta = phase("config 400", rate_400=1.0)
+        if not outcome.startswith("BadRequestError") or delta["chat"] != 1:
+            failed.append("config 400")
+    finally:
+        stop_server(server)
+
+    if failed:
+        print(f"\nfailed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+부하 테스트용 가짜 외부 서버 (실제 OCR/GPT 쿼터를 쓰지 않기 위함)
+
+- CLOVA General OCR V2: POST /ocr/general
+  fixtures/clova_general_registry.json 에 녹화해 둔 images[].tables[].cells 응답을 이미지 수만큼 돌려준다
+- OpenAI chat completions: POST /v1/chat/completions
+  번역 요청({"values": [...]})은 값마다 접두어를 붙여 돌려주고 ("languages"가 있으면 언어별 객체),
+  그 외(구조화)는 고정 JSON을 돌려준다
+
+- 이미지 호스트: GET /images/{name} (ETag/Last-Modified, 조건부 요청이면 304)
+- S3 대역(moto 서버처럼 S3_ENDPOINT_URL로 연결): HEAD/GET /{bucket}/{key} (ETag, Range)
+
+지연시간/오류 비율은 MockConfig로 조정한다.
+"""
+import copy
+import json
+import hashlib
+import time
+import random
+import asyncio
+import threading
+from email import policy
+from email.parser import BytesParser
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from email.utils import formatdate
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+STRUCTURED_RESULT = {
+    "documentType": "document",
+    "fullName": "김가영",
+    "dateOfBirth": "2000-08-12",
+    "universityName": "숙명여자대학교",
+    "major": "컴퓨터과학전공",
+    "grade": "3",
+    "dateOfIssue": "2025-07-18",
+    "rows": [{"no": str(i), "content": f"기재사항 {i}"} for i in range(10)],
+}
+
+
+class MockConfig:
+    def __init__(self, ocr_latency: float = 0.3, gpt_latency: float = 1.0, jitter: float = 0.3,
+                 rate_429: float = 0.0, rate_5xx: float = 0.0, rate_truncate: float = 0.0,
+                 rate_mismatch: float = 0.0, rate_400: float = 0.0, max_values: int = 0):
+        self.ocr_latency = ocr_latency  # 초
+        self.gpt_latency = gpt_latency  # 초
+        self.jitter = jitter            # 지연시간에 곱해지는 ±비율
+        self.rate_429 = rate_429        # chat completions 429 비율
+        self.rate_5xx = rate_5xx        # OCR/chat completions 503 비율
+        self.rate_truncate = rate_truncate  # 번역 응답 JSON을 중간에서 자르는 비율 (finish_reason=length)
+        self.rate_mismatch = rate_mismatch  # 번역 응답에서 값 하나를 빠뜨리는 비율
+        self.rate_400 = rate_400        # chat completions 400 비율 (모델명 오류 같은 설정 오류)
+        self.max_values = max_values    # 번역 요청 값이 이보다 많으면 400 context_length_exceeded (0이면 제한 없음)
+        self.counts = {"ocr": 0, "chat": 0, "429": 0, "5xx": 0, "truncated": 0, "mismatch": 0, "400": 0, "object_body": 0, "object_304": 0,
+                       "object_head": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    async def sleep(self, base: float) -> None:
+        await asyncio.sleep(max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter))))
+
+
+def _form_parts(content_type: str, body: bytes) -> dict:
+    # python-multipart 없이 multipart/form-data 파싱 (name → [bytes])
+    msg = BytesParser(policy=policy.default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body)
+    parts = {}
+    for part in msg.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        parts.setdefault(name, []).append(part.get_payload(decode=True))
+    return parts
+
+
+def _usage(messages, completion: str) -> dict:
+    # 대략 4글자 = 1토큰
+    prompt_chars = len(json.dumps(messages, ensure_ascii=False))
+    prompt, completion_tokens = prompt_chars // 4, len(completion) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion_tokens,
+            "total_tokens": prompt + completion_tokens}
+
+
+def _last_user_text(messages) -> str:
+    content = messages[-1].get("content")
+    if isinstance(content, list):
+        return "".join(c.get("text", "") for c in content if c.get("type") == "text")
+    return content or ""
+
+
+def create_ocr_app(config: MockConfig) -> FastAPI:
+    app = FastAPI()
+    recorded = json.loads((FIXTURES / "clova_general_registry.json").read_text(encoding="utf-8"))
+    page = recorded["images"][0]
+
+    @app.post("/ocr/general")
+    async def general(request: Request):
+        config.count("ocr")
+        await config.sleep(config.ocr_latency)
+        if random.random() < config.rate_5xx:
+            config.count("5xx")
+            return JSONResponse({"code": "0500", "message": "mock error"}, status_code=503)
+
+        parts = _form_parts(request.headers["content-type"], await request.body())
+        message = json.loads(parts["message"][0])
+        images = []
+        for i, meta in enumerate(message.get("images") or []):
+            img = copy.deepcopy(page)
+            img["name"] = meta.get("name", f"page-{i + 1}")
+            img["convertedImageInfo"]["pageIndex"] = i
+            images.append(img)
+        return {"version": "V2", "requestId": message.get("requestId"),
+                "timestamp": int(time.time() * 1000), "images": images}
+
+    return app
+
+
+def create_openai_app(config: MockConfig) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        config.count("chat")
+        body = await request.json()
+        await config.sleep(config.gpt_latency)
+        roll = random.random()
+        if roll < config.rate_429:
+            config.count("429")
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429, headers={"retry-after-ms": "200"},
+            )
+        if roll < config.rate_429 + config.rate_5xx:
+            config.count("5xx")
+            return JSONResponse({"error": {"message": "mock error", "type": "server_error"}}, status_code=503)
+
+        if roll < config.rate_429 + config.rate_5xx + config.rate_400:
+            config.count("400")
+            return JSONResponse({"error": {"message": "The model `mock` does not exist (mock)",
+                                           "type": "invalid_request_error", "code": "model_not_found"}},
+                                status_code=400)
+
+        messages = body.get("messages") or []
+        finish_reason = "stop"
+        try:
+            payload = json.loads(_last_user_text(messages))
+            values = payload["values"]
+        except Exception:
+            content = json.dumps(STRUCTURED_RESULT, ensure_ascii=False)
+        else:
+            if config.max_values and len(values) > config.max_values:
+                config.count("400")
+                return JSONResponse({"error": {"message": "This model's maximum context length is exceeded (mock)",
+                                               "type": "invalid_request_error", "code": "context_length_exceeded"}},
+                                    status_code=400)
+            # languages가 있으면 여러 언어를 한 번에 (값마다 {언어: 번역})
+            langs = payload.get("languages")
+            translated = ([{lang: f"[{lang}] {v}" for lang in langs} for v in values] if langs
+                          else [f"[tr] {v}" for v in values])
+            roll = random.random()
+            if len(values) > 1 and roll < config.rate_mismatch:
+                config.count("mismatch")
+                translated.pop(random.randrange(len(translated)))
+            content = json.dumps({"values": translated}, ensure_ascii=False)
+            if len(values) > 1 and config.rate_mismatch <= roll < config.rate_mismatch + config.rate_truncate:
+                config.count("truncated")
+                content, finish_reason = content[:random.randint(len(content) // 3, len(content) - 2)], "length"
+
+        return {
+            "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": finish_reason,
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": _usage(messages, content),
+        }
+
+    return app
+
+
+def _object_headers(data: bytes, last_modified: float) -> dict:
+    return {"ETag": f'"{hashlib.md5(data).hexdigest()}"', "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Accept-Ranges": "bytes", "Content-Type": "image/jpeg"}
+
+
+def create_image_host_app(config: MockConfig, objects: dict) -> FastAPI:
+    """objects: 이름 → 바이트. 내용을 바꾸면 ETag도 바뀐다"""
+    app = FastAPI()
+    started = time.time()
+
+    @app.get("/images/{name}")
+    async def image(name: str, request: Request):
+        data = objects.get(name)
+        if data is None:
+            return JSONResponse({"detail": "not found"}, status_code=404)
+        headers = _object_headers(data, started)
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            config.count("object_304")
+            return Response(status_code=304, headers={"ETag": headers["ETag"]})
+        config.count("object_body")
+        return Response(data, headers=headers)
+
+    return app
+
+
+def create_s3_app(config: MockConfig, buckets: dict) -> FastAPI:
+    """buckets: 버킷 → {키: 바이트}. boto3의 head_object / get_object(Range, IfNoneMatch)만 흉내낸다"""
+    app = FastAPI()
+    started = time.time()
+
+    def lookup(bucket: str, key: str):
+        return (buckets.get(bucket) or {}).get(key)
+
+    @app.head("/{bucket}/{key:path}")
+    async def head(bucket: str, key: str):
+        config.count("object_head")
+        data = lookup(bucket, key)
+        if data is None:
+            return Response(status_code=404)
+        return Response(headers={**_object_headers(data, started), "Content-Length": str(len(data))})
+
+    @app.get("/{bucket}/{key:path}")
+    async def get(bucket: str, key: str, request: Request):
+        data = lookup(bucket, key)
+        if data is None:
+            body = "<Error><Code>NoSuchKey</Code><Message>not found</Message></Error>"
+            return Response(body, status_code=404, media_type="application/xml")
+        headers = _object_headers(data, started)
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            config.count("object_304")
+            return Response(status_code=304, headers={"ETag": headers["ETag"]})
+        config.count("object_body")
+        rng = request.headers.get("range")
+        if rng and rng.startswith("bytes="):
+            first, _, last = rng[6:].partition("-")
+            first, last = int(first), min(int(last or len(data) - 1), len(data) - 1)
+            headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+            return Response(data[first:last + 1], status_code=206, headers=headers)
+        return Response(data, headers=headers)
+
+    return app
+
+
+def start_server(app, host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """백그라운드 스레드에서 uvicorn 실행. (server, 실제 포트) 반환"""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("mock server failed to start")
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, port
+
+
+def stop_server(server) -> None:
+    server.should_exit = True
@@ -1,41 +1,75 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List
 import traceback
 import os
 import json
-import shutil
 import uuid
+import asyncio
+import time
 from fastapi.staticfiles import StaticFiles
-from tempfile import NamedTemporaryFile
-from utils.image_processing import binarize_image
-from utils.ocr_client import call_ocr
-from utils.gpt_client import call_gpt_for_structured_json
-from utils.s3_http_downloader import ensure_local
-from utils.translate_gpt_client import call_gpt_for_translate_json
+from utils.translate_gpt_client import call_gpt_for_translate_json, translate_incremental, translate_multi
+from utils.translation_store import load_translation, save_translation
+from utils.token_count import warm_tokenizer
 from utils.generate_doc.generate_building_registry_docx import generate_building_registry_docx
 from utils.generate_doc.generate_enrollment_certificate_docx import generate_enrollment_certificate_docx
 from utils.generate_doc.generate_family_relationship_docx import generate_family_relationship_docx
+from utils.generate_doc.template_registry import preload_templates
 from pydantic import BaseModel
-from utils.gpt_structure_from_ocr import call_gpt_for_structured_from_ocr
+from utils.executors import run_cpu, run_io, shutdown_executors
+from utils.pipeline import run_structuring_pipeline
+from utils.preprocess_pool import PreprocessBusy, preprocess_stats, shutdown_preprocess_pool, start_preprocess_pool
+from utils.job_runner import JobRunner
+from utils.async_clients import close_async_clients
+from utils.http_session import connection_stats
+from utils.object_cache import get_object_cache
+from utils.result_cache import get_result_cache
+from utils.logging_setup import bind_request_id, bind_session_id, setup_logging, shutdown_logging
+from utils.metrics import HTTP_REQUEST_SECONDS, begin_request, render as render_metrics, server_timing, timed
+from utils.retention import RETENTION_ENABLED, run_retention_sweeper, touch_session
+from utils.docx_output import (
+    DOCX_MEDIA_TYPE, DOCX_PERSIST_COPY, content_disposition, persist_copy, run_sweeper, serialize_docx,
+)
+from contextlib import asynccontextmanager
 from fastapi.responses import FileResponse
 from utils.is_within_directory import is_within_directory
 from typing import Optional, Dict, Any
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-import logging, sys, os, json, traceback
+import logging
 
 
-logging.basicConfig(
-    level=logging.DEBUG,  
-    format="%(asctime)s %(levelname)s %(name)s %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+# LOG_LEVEL / LOG_FORMAT / LOG_DEBUG_SAMPLE_RATE 환경변수로 조정
+setup_logging()
 log = logging.getLogger("lingoai")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    preload_templates()
+    # 토크나이저 인코딩을 백그라운드로 불러 둔다 (실제 토크나이저인지 추정치인지는 끝나면 로그로)
+    warm_tokenizer()
+    # 이진화 워커 프로세스를 미리 띄워 둔다
+    await run_io(start_preprocess_pool)
+    app.state.jobs = JobRunner()
+    # 사본 저장 모드일 때만 translated_outputs/ TTL 정리
+    sweeper = asyncio.create_task(run_sweeper()) if DOCX_PERSIST_COPY else None
+    # outputs/<session>/ 보존 기간/용량 정리
+    retention = (asyncio.create_task(run_retention_sweeper(on_removed=app.state.jobs.expire))
+                 if RETENTION_ENABLED else None)
+    yield
+    for task in (sweeper, retention):
+        if task is not None:
+            task.cancel()
+    await app.state.jobs.shutdown()
+    await close_async_clients()
+    shutdown_preprocess_pool()
+    shutdown_executors()
+    shutdown_logging()
+
+
+app = FastAPI(lifespan=lifespan)
 
 os.makedirs("outputs", exist_ok=True)
 app.mount("/outputs", StaticFiles(directory="outputs"), name="outputs")
@@ -58,16 +92,77 @@ class JsonPathRequest(BaseModel):
     json_path: str
     lang: str
 
-\
-# 디렉터리 삭제
-def delete_directory(path: str):
-    shutil.rmtree(path)
 
+class IncrementalTranslateRequest(BaseModel):
+    base_translation_id: str  # 이전 /translate 응답의 translation_id
+    editedContentJson: Dict[str, Any]  # 수정된 원문 전체
+    lang: Optional[str] = None  # 생략하면 기준 번역과 같은 언어
+
+
+class TranslateMultiRequest(BaseModel):
+    json_path: str
+    langs: List[str]
+    combined: bool = False  # True면 값마다 모든 언어를 한 번의 호출로 받음
+
+\
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    print("[422 BODY]", await request.body())
-    print("[422 ERRORS]", exc.errors())
+    # 본문 전체 대신 크기와 오류 위치만 남긴다 (입력값 제외)
+    body = await request.body()
+    log.warning("request validation failed", extra={
+        "path": request.url.path,
+        "body_bytes": len(body),
+        "errors": [{k: v for k, v in e.items() if k not in ("input", "ctx")} for e in exc.errors()],
+    })
     return JSONResponse(status_code=422, content={"detail": exc.errors()})
+# 요청별 단계 시간 → Server-Timing 헤더 + 요청 지연 히스토그램
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    timings = begin_request()
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - t0
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=response.status_code,
+    )
+    response.headers["Server-Timing"] = server_timing(timings, elapsed)
+    return response
+
+
+# 요청 상관관계 id (X-Request-ID를 받으면 그대로 사용). 세션 id는 핸들러에서 붙인다
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    bind_request_id(request_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# 커넥션 풀 재사용 현황 (요청 수 vs 새 연결 수)
+@app.get("/stats/http")
+def http_stats():
+    return connection_stats()
+
+# 디스크 캐시 상태 (결과 캐시 / 원격 이미지 캐시, 비활성화면 null)
+@app.get("/stats/cache")
+def cache_stats():
+    result_cache, object_cache = get_result_cache(), get_object_cache()
+    return {
+        "result": result_cache.stats() if result_cache is not None else None,
+        "object": object_cache.stats() if object_cache is not None else None,
+    }
+
+# 이진화 풀 상태 (실행 중/대기 중 페이지 수)
+@app.get("/stats/preprocess")
+def preprocess_pool_stats():
+    return preprocess_stats()
+
 #웹에서 파일 내용 확인용
 @app.get("/outputs/{uuid}/{filename}")
 def get_output_file(uuid: str, filename: str):
@@ -77,100 +172,106 @@ def get_output_file(uuid: str, filename: str):
 
  #이진화 + OCR + GPT 구조화 (부동산등기부등본/가족관계증명서/재학증명서)
 @app.post("/binarize-and-ocr-multi")
-def binarize_and_ocr_multi(request: MultiImagePathRequest):
-    print("image_paths:", request.image_paths)
+async def binarize_and_ocr_multi(request: MultiImagePathRequest):
     session_id = str(uuid.uuid4())
+    bind_session_id(session_id)
+    log.debug("structuring request", extra={"doc_type": request.doc_type, "pages": len(request.image_paths)})
     output_dir = os.path.join("outputs", session_id)
     os.makedirs(output_dir, exist_ok=True)
 
     if not request.image_paths:
         raise HTTPException(status_code=400, detail="image_paths is empty")
 
-    results = []
-    image_paths_for_gpt = []  
     try:
-        for p in request.image_paths:
-            local_input_path = ensure_local(p, output_dir)
-            base_name = os.path.splitext(os.path.basename(local_input_path))[0]
-
-            # 이진화
-            binary_path = binarize_image(local_input_path, output_dir)
-
-            result_item = {
-                "original_image": p,
-                "binary_image": binary_path,
-            }
-
-         
-            if request.doc_type == "부동산등기부등본":
-                ocr_json_path = os.path.join(output_dir, f"{base_name}_ocr.json")
-                ocr_result = call_ocr(binary_path, ocr_json_path)
-                result_item.update({
-                    "ocr_json_file": ocr_json_path,
-                    "ocr_result": ocr_result,
-                })
-            else:
+        path = await run_structuring_pipeline(request.image_paths, request.doc_type, session_id, output_dir)
+        return {"path": path}
 
-                image_paths_for_gpt.append(binary_path)
+    except PreprocessBusy as e:
+        log.warning("preprocess pool saturated", extra={"pages": len(request.image_paths)})
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception:
+        tb = traceback.format_exc()
+        log.exception("/binarize-and-ocr-multi failed", extra={"doc_type": request.doc_type})
+        raise HTTPException(status_code=500, detail=tb)
+    
 
-            results.append(result_item)
+# 잡 큐: 즉시 job id 반환 → 상태 조회 → 결과 조회
+@app.post("/jobs", status_code=202)
+async def submit_job(request: MultiImagePathRequest, req: Request):
+    if not request.image_paths:
+        raise HTTPException(status_code=400, detail="image_paths is empty")
+    job_id = await req.app.state.jobs.submit(request.image_paths, request.doc_type)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, req: Request):
+    job = await req.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job을 찾을 수 없습니다.")
+    job.pop("result", None)
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, req: Request):
+    job = await req.app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job을 찾을 수 없습니다.")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job.get("error") or "job failed")
+    if job["status"] == "expired":
+        raise HTTPException(status_code=410, detail="job 결과가 보존 기간이 지나 삭제되었습니다.")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"job이 아직 완료되지 않았습니다: {job['status']}")
+
+    path = job["result"]["path"]
+    touch_session(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        # 보존 정책 정리 직후 (잡 만료 처리 전)
+        raise HTTPException(status_code=410, detail="job 결과가 보존 기간이 지나 삭제되었습니다.")
+    try:
+        obj = json.loads(text)
+    except Exception:
+        obj = None
+    return {"path": path, "result": obj}
 
-        merged_path = os.path.join(output_dir, "merged_results.json")
-        with open(merged_path, "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
 
-      
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return f.read()
 
-        if request.doc_type == "부동산등기부등본":
-            try:
-                with open(merged_path, "r", encoding="utf-8") as f:
-                    ocr_data = json.load(f)
-                if not isinstance(ocr_data, list):
-                    raise ValueError("merged_results.json 형식이 리스트가 아닙니다.")
-
-                gpt_json_result = call_gpt_for_structured_from_ocr(ocr_data, request.doc_type)
-
-                gpt_structured_path = os.path.join(output_dir, f"{session_id}_gpt_structured.json")
-                with open(gpt_structured_path, "w", encoding="utf-8") as f:
-                    f.write(gpt_json_result)
-            
-
-                return {"path": gpt_structured_path.replace("\\", "/")}
-            
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"등기부 GPT 구조화 실패: {e}")
-        else:
-            if not image_paths_for_gpt:
-                raise HTTPException(status_code=500, detail="gpt 구조화를 위한 이미지가 없습니다.")
-            
-            gpt_result_path = os.path.join(output_dir, f"{session_id}_gpt_structured_result.json")
-            gpt_json_result = call_gpt_for_structured_json(image_paths_for_gpt, request.doc_type)
-            with open(gpt_result_path, "w", encoding="utf-8") as f:
-                f.write(gpt_json_result)
 
-            return {"path": gpt_result_path.replace("\\", "/")}
+def _write_translation(output_dir: str, gpt_result_path: str, text: str, lang: str, **source) -> str:
+    """번역 결과 파일을 쓰고 /translate/incremental 기준 스냅샷을 남긴다 (IO 풀에서 실행). translation_id 반환"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(gpt_result_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return save_translation(output_dir, gpt_result_path, lang, **source)
 
-    except Exception:
-        tb = traceback.format_exc()
-        print("ERROR in /binarize-and-ocr-multi:", tb)
-        raise HTTPException(status_code=500, detail=tb)
-    
 
 # 번역
 @app.post("/translate")
-def translate(request: JsonPathRequest, background_tasks: BackgroundTasks):
+async def translate(request: JsonPathRequest, background_tasks: BackgroundTasks):
     try:
         base_name = os.path.basename(request.json_path).split('.')[0]
+        touch_session(request.json_path)
         session_id = str(uuid.uuid4())
+        bind_session_id(session_id)
         output_dir = os.path.join("outputs", session_id)
         os.makedirs(output_dir, exist_ok=True)
 
-        gpt_json_result = call_gpt_for_translate_json(request.json_path, request.lang)
+        # 번역 클라이언트는 내부에서 배치를 스레드로 병렬 처리하므로 IO 풀에서 실행
+        gpt_json_result = await run_io(call_gpt_for_translate_json, request.json_path, request.lang)
 
         # 파일로도 저장
         gpt_result_path = os.path.join(output_dir, f"{base_name}_gpt_translate_result.json")
-        with open(gpt_result_path, 'w', encoding='utf-8') as f:
-            f.write(gpt_json_result)
+        # 이후 /translate/incremental 의 기준이 되도록 원문 스냅샷을 남긴다
+        translation_id = await run_io(_write_translation, output_dir, gpt_result_path, gpt_json_result, request.lang,
+                                      source_path=request.json_path)
 
         #객체로 
         try:
@@ -178,33 +279,156 @@ def translate(request: JsonPathRequest, background_tasks: BackgroundTasks):
         except Exception:
             obj = None  
 
-        return {"path": gpt_result_path, "result": obj}
+        return {"path": gpt_result_path, "result": obj, "translation_id": translation_id}
     
     except Exception:
-        tb = traceback.format_exc()
-        print("ERROR in /translate:", tb)
+        log.exception("/translate failed", extra={"lang": request.lang})
         raise HTTPException(status_code=500, detail="translate failed")
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# 클라이언트가 끊어도 번역은 끝까지 진행해서 저장한다 (태스크가 GC되지 않도록 참조 유지)
+_stream_tasks: set = set()
+
+
+# 번역 스트리밍 (SSE): 배치가 끝날 때마다 (path, 번역값)을 보내고, 마지막에 전체 JSON과 저장 경로
+# - start: {"total"}  - batch: {"pairs": [{"path", "value"}], "translated", "total"}
+# - done: {"path", "result", "translation_id"}  - error: {"detail"}
+@app.post("/translate/stream")
+async def translate_stream(request: JsonPathRequest):
+    base_name = os.path.basename(request.json_path).split('.')[0]
+    touch_session(request.json_path)
+    session_id = str(uuid.uuid4())
+    bind_session_id(session_id)
+    output_dir = os.path.join("outputs", session_id)
+    os.makedirs(output_dir, exist_ok=True)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_batch(pairs, total):
+        # 번역 스레드에서 호출됨 → 이벤트 루프의 큐로 넘긴다
+        loop.call_soon_threadsafe(queue.put_nowait, ("batch", pairs, total))
+
+    async def run():
+        try:
+            gpt_json_result = await run_io(call_gpt_for_translate_json, request.json_path, request.lang, on_batch)
+            gpt_result_path = os.path.join(output_dir, f"{base_name}_gpt_translate_result.json")
+            translation_id = await run_io(_write_translation, output_dir, gpt_result_path, gpt_json_result,
+                                          request.lang, source_path=request.json_path)
+            await queue.put(("done", gpt_json_result, gpt_result_path, translation_id))
+        except Exception:
+            log.exception("/translate/stream failed", extra={"lang": request.lang})
+            await queue.put(("error",))
+
+    task = asyncio.create_task(run())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+
+    async def events():
+        translated = 0
+        while True:
+            item = await queue.get()
+            if item[0] == "batch":
+                _, pairs, total = item
+                if not pairs:
+                    yield _sse("start", {"total": total})
+                    continue
+                translated += len(pairs)
+                yield _sse("batch", {
+                    "pairs": [{"path": list(path), "value": value} for path, value in pairs],
+                    "translated": translated, "total": total,
+                })
+            elif item[0] == "done":
+                _, text, path, translation_id = item
+                yield _sse("done", {"path": path, "result": json.loads(text), "translation_id": translation_id})
+                return
+            else:
+                yield _sse("error", {"detail": "translate failed"})
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# 증분 재번역: 이전 번역의 원문과 경로별로 비교해서 바뀐 값만 번역
+@app.post("/translate/incremental")
+async def translate_incremental_endpoint(request: IncrementalTranslateRequest):
+    base = await run_io(load_translation, request.base_translation_id)
+    if base is None:
+        raise HTTPException(status_code=404, detail="기준 번역을 찾을 수 없습니다.")
+    lang = request.lang or base["lang"]
+    # 언어가 다르면 재사용할 번역이 없으므로 전체 번역과 같다
+    base_source = base["source"] if lang == base["lang"] else {}
+
+    session_id = str(uuid.uuid4())
+    bind_session_id(session_id)
+    output_dir = os.path.join("outputs", session_id)
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        gpt_json_result, stats = await run_io(
+            translate_incremental, base_source, base["result"], request.editedContentJson, lang)
+        gpt_result_path = os.path.join(output_dir, f"{session_id}_gpt_translate_result.json")
+        translation_id = await run_io(_write_translation, output_dir, gpt_result_path, gpt_json_result, lang,
+                                      source=request.editedContentJson)
+    except Exception:
+        log.exception("/translate/incremental failed", extra={"lang": lang})
+        raise HTTPException(status_code=500, detail="translate failed")
+
+    return {"path": gpt_result_path, "result": json.loads(gpt_json_result), "translation_id": translation_id,
+            "base_translation_id": request.base_translation_id, **stats}
+
+
+# 여러 언어로 한 번에: 문자열 수집/중복 제거는 한 번, 언어마다 결과 파일과 translation_id
+@app.post("/translate-multi")
+async def translate_multi_endpoint(request: TranslateMultiRequest):
+    langs = list(dict.fromkeys(request.langs))
+    if not langs:
+        raise HTTPException(status_code=400, detail="langs가 비어 있습니다.")
+    try:
+        base_name = os.path.basename(request.json_path).split('.')[0]
+        touch_session(request.json_path)
+        json_text = await run_io(_read_text, request.json_path)
+        translated, report = await run_io(translate_multi, json_text, langs, request.combined)
+
+        async def store(lang: str) -> dict:
+            # 언어마다 별도 세션 (단일 /translate 결과와 같은 구조라 /translate/incremental 기준으로 쓸 수 있음)
+            output_dir = os.path.join("outputs", str(uuid.uuid4()))
+            gpt_result_path = os.path.join(output_dir, f"{base_name}_gpt_translate_result.json")
+            translation_id = await run_io(_write_translation, output_dir, gpt_result_path, translated[lang], lang,
+                                          source_path=request.json_path)
+            return {"path": gpt_result_path, "result": json.loads(translated[lang]), "translation_id": translation_id}
+
+        results = dict(zip(langs, await asyncio.gather(*(store(lang) for lang in langs))))
+    except Exception:
+        log.exception("/translate-multi failed", extra={"langs": langs, "combined": request.combined})
+        raise HTTPException(status_code=500, detail="translate failed")
+
+    return {"results": results, "report": report}
+
+
 @app.post("/generate-doc")
-def generate_doc(request: CreateDocRequest, background_tasks: BackgroundTasks):
-    log.debug(f"/generate-doc payload keys={list(request.model_dump().keys())}")
-    print("[DEBUG] doc_type=", request.doc_type)
-    print("[DEBUG] json_path=", request.json_path)
-    print("[DEBUG] ocr_path=", request.ocr_path)
-    print("[DEBUG] exists(json_path)=", os.path.exists(request.json_path or ""))
+async def generate_doc(request: CreateDocRequest, background_tasks: BackgroundTasks):
+    log.debug("generate-doc request", extra={
+        "doc_type": request.doc_type, "lang": request.lang,
+        "json_path": request.json_path, "ocr_path": request.ocr_path,
+        "edited": request.editedContentJson is not None,
+    })
 
     # editedContentJson 받으면 임시 파일로 저장해서 json_path로 사용
     temp_json_path = None
     if request.editedContentJson is not None:
         session_id = str(uuid.uuid4())
+        bind_session_id(session_id)
         output_dir = os.path.join("outputs", session_id)
         os.makedirs(output_dir, exist_ok=True)
         temp_json_path = os.path.join(output_dir, f"{session_id}_edited.json")
         with open(temp_json_path, "w", encoding="utf-8") as f:
             json.dump(request.editedContentJson, f, ensure_ascii=False, indent=2)
         request.json_path = temp_json_path  # 이후 로직은 기존과 동일하게 처리
-        print("[DEBUG] wrote editedContentJson to:", temp_json_path)
 
     # json_path 없으면 에러
     if not request.json_path:
@@ -212,26 +436,32 @@ def generate_doc(request: CreateDocRequest, background_tasks: BackgroundTasks):
 
     if not os.path.exists(request.json_path):
         raise HTTPException(status_code=400, detail=f"json_path가 없습니다: {request.json_path}")
+    # 원본 세션이 정리되지 않도록 접근 시각 갱신
+    touch_session(request.json_path)
+    touch_session(request.ocr_path)
 
     # 문서 생성
-    if request.doc_type == "부동산등기부등본":
-        doc = generate_building_registry_docx(request.json_path, request.ocr_path or "", request.lang)
-    elif request.doc_type == "가족관계증명서":
-        doc = generate_family_relationship_docx(request.json_path, request.lang)
-    elif request.doc_type == "재학증명서":
-        doc = generate_enrollment_certificate_docx(request.json_path, request.lang)
-    else:
-        raise HTTPException(status_code=400, detail="지원하지 않는 문서 유형입니다.")
-
-    # 결과 파일 저장 및 반환
-    os.makedirs("translated_outputs", exist_ok=True)
-    with NamedTemporaryFile(delete=False, suffix=".docx", dir="translated_outputs") as tmp:
-        temp_path = tmp.name
-        doc.save(temp_path)
+    with timed("generate_doc"):
+        if request.doc_type == "부동산등기부등본":
+            doc = await run_cpu(generate_building_registry_docx, request.json_path, request.ocr_path or "", request.lang)
+        elif request.doc_type == "가족관계증명서":
+            doc = await run_cpu(generate_family_relationship_docx, request.json_path, request.lang)
+        elif request.doc_type == "재학증명서":
+            doc = await run_cpu(generate_enrollment_certificate_docx, request.json_path, request.lang)
+        else:
+            raise HTTPException(status_code=400, detail="지원하지 않는 문서 유형입니다.")
 
+    # 메모리에서 직렬화해서 바로 반환 (디스크를 거치지 않음)
+    with timed("serialize_docx"):
+        data = await run_cpu(serialize_docx, doc)
     base_name = os.path.splitext(os.path.basename(request.json_path))[0]
-    return FileResponse(
-        path=temp_path,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=f"{base_name}_translated.docx"
+    filename = f"{base_name}_translated.docx"
+    if DOCX_PERSIST_COPY:
+        # 사본은 응답을 보낸 뒤에 저장
+        background_tasks.add_task(persist_copy, data, filename)
+
+    return Response(
+        content=data,
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": content_disposition(filename)},
     )
\ No newline at end of file
@@ -0,0 +1,73 @@
+import os
+import random
+import asyncio
+from typing import Optional
+
+import httpx
+import openai
+from dotenv import load_dotenv
+from utils.http_session import new_async_client
+from utils.metrics import record_openai_error, record_retry
+
+load_dotenv()
+
+# 구조화 호출 재시도 (SDK 자체 재시도는 끄고 여기서만 → 재시도 수가 lingo_upstream_retries_total에 잡힌다)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_BACKOFF_SEC = float(os.getenv("OPENAI_BACKOFF_SEC", "1.0"))
+OPENAI_BACKOFF_MAX_SEC = float(os.getenv("OPENAI_BACKOFF_MAX_SEC", "20"))
+
+# 비동기 핸들러에서 공유하는 클라이언트 (워커 프로세스당 1개)
+_http: Optional[httpx.AsyncClient] = None
+_openai: Optional[openai.AsyncOpenAI] = None
+
+
+def get_async_http() -> httpx.AsyncClient:
+    global _http
+    if _http is None:
+        _http = new_async_client()
+    return _http
+
+
+def get_async_openai() -> openai.AsyncOpenAI:
+    global _openai
+    if _openai is None:
+        _openai = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY") or os.getenv("GPT-API-KEY"), max_retries=0)
+    return _openai
+
+
+def _retry_after(err: openai.APIError) -> Optional[float]:
+    headers = getattr(getattr(err, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+async def create_chat_completion(**kwargs):
+    """chat.completions.create + 429/5xx/연결 오류 재시도 (Retry-After 우선, 없으면 jitter backoff)"""
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            return await get_async_openai().chat.completions.create(**kwargs)
+        except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+            if attempt == OPENAI_MAX_RETRIES or "insufficient_quota" in str(e):
+                raise
+            record_openai_error(e)
+            record_retry("openai")
+            wait = _retry_after(e)
+            if wait is None:
+                wait = min(OPENAI_BACKOFF_SEC * (2 ** attempt), OPENAI_BACKOFF_MAX_SEC) + random.uniform(0, OPENAI_BACKOFF_SEC)
+            await asyncio.sleep(wait)
+
+
+async def close_async_clients() -> None:
+    global _http, _openai
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+    if _openai is not None:
+        await _openai.close()
+        _openai = None
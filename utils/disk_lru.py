@@ -0,0 +1,124 @@
+import os
+import time
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+# 용량 제한이 있는 디스크 LRU 디렉터리 (결과 캐시 / 원격 이미지 캐시 공용)
+# - 저장: root/<키 앞 2글자>/<키><suffix>, 파일 mtime = 마지막 접근 시각
+# - 총 용량은 처음 쓸 때 한 번만 스캔하고 이후에는 쓰기/삭제마다 갱신
+# - max_bytes를 넘으면 오래 안 쓴 것부터 90%까지 삭제, ttl_sec가 있으면 만료 항목도 삭제
+# - companions: 본문과 함께 지울 부속 파일 확장자 (예: 검증 정보 .json)
+T = TypeVar("T")
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class DiskLRU:
+    def __init__(self, root: str, max_bytes: int, suffix: str, ttl_sec: int = 0,
+                 companions: Sequence[str] = ()):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.ttl_sec = ttl_sec
+        self.companions = tuple(companions)
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def path(self, key: str, suffix: Optional[str] = None) -> str:
+        return os.path.join(self.root, key[:2], f"{key}{self.suffix if suffix is None else suffix}")
+
+    def touch(self, path: str) -> None:
+        os.utime(path)  # LRU 갱신
+
+    def is_expired(self, mtime: float) -> bool:
+        return self.ttl_sec > 0 and time.time() - mtime > self.ttl_sec
+
+    def write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        old = os.path.getsize(path) if os.path.exists(path) else 0
+        atomic_write(path, data)
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data) - old
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def remove(self, path: str, size: int) -> None:
+        removed = self._unlink(path)
+        with self._lock:
+            if removed and self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _unlink(self, path: str) -> bool:
+        base = path[:-len(self.suffix)]
+        for companion in self.companions:
+            try:
+                os.remove(base + companion)
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, 크기, 경로) 목록"""
+        if not os.path.isdir(self.root):
+            return []
+        out = []
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                if e.name.endswith(self.suffix):
+                    st = e.stat()
+                    out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        """만료된 항목을 지우고, 용량의 90% 이하가 될 때까지 오래 안 쓴 순으로 지운다. 지운 바이트 수 반환"""
+        # mtime 오름차순이므로 만료된 항목은 항상 앞쪽에 모여 있다
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        for mtime, size, path in entries:
+            if not self.is_expired(mtime) and total - freed <= target:
+                break
+            if self._unlink(path):
+                freed += size
+        with self._lock:
+            self._total_bytes = total - freed
+        return freed
+
+    @property
+    def total_bytes(self) -> Optional[int]:
+        with self._lock:
+            return self._total_bytes
+
+
+def lazy_default(factory: Callable[[], T], enabled: bool = True) -> Callable[[], Optional[T]]:
+    """처음 호출할 때 한 번만 만드는 기본 인스턴스 getter. enabled=False면 항상 None"""
+    instance: List[T] = []
+    lock = threading.Lock()
+
+    def get() -> Optional[T]:
+        if not enabled:
+            return None
+        with lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+    return get
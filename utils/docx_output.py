@@ -0,0 +1,79 @@
+import io
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+from docx import Document
+
+from utils.executors import run_io
+
+# /generate-doc 결과는 메모리에서 직렬화해서 바로 응답한다
+# DOCX_PERSIST_COPY=1이면 translated_outputs/에 사본을 남기고, 주기적으로 TTL이 지난 사본을 지운다
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DOCX_PERSIST_COPY = os.getenv("DOCX_PERSIST_COPY", "0") != "0"
+DOCX_OUTPUT_DIR = os.getenv("DOCX_OUTPUT_DIR", "translated_outputs")
+DOCX_OUTPUT_TTL_SEC = int(os.getenv("DOCX_OUTPUT_TTL_SEC", str(24 * 3600)))
+DOCX_SWEEP_INTERVAL_SEC = int(os.getenv("DOCX_SWEEP_INTERVAL_SEC", "600"))
+
+log = logging.getLogger(__name__)
+
+
+def serialize_docx(doc: Document) -> bytes:
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def content_disposition(filename: str) -> str:
+    # 한글 파일명은 RFC 5987 형식으로
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def persist_copy(data: bytes, filename: str, output_dir: str = DOCX_OUTPUT_DIR) -> str:
+    """사본 저장 (임시 파일에 쓰고 rename → 반쯤 쓰인 파일을 스위퍼가 보지 않도록)"""
+    os.makedirs(output_dir, exist_ok=True)
+    base, ext = os.path.splitext(os.path.basename(filename))
+    path = os.path.join(output_dir, f"{base}_{uuid.uuid4().hex[:8]}{ext or '.docx'}")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def sweep_expired(output_dir: str = DOCX_OUTPUT_DIR, ttl_sec: int = DOCX_OUTPUT_TTL_SEC) -> Tuple[int, int]:
+    """TTL이 지난 파일 삭제. (삭제한 파일 수, 바이트 수) 반환"""
+    if not os.path.isdir(output_dir):
+        return 0, 0
+    now = time.time()
+    files = freed = 0
+    for e in os.scandir(output_dir):
+        if not e.is_file():
+            continue
+        try:
+            st = e.stat()
+            if now - st.st_mtime <= ttl_sec:
+                continue
+            os.remove(e.path)
+        except FileNotFoundError:
+            continue
+        files += 1
+        freed += st.st_size
+    return files, freed
+
+
+async def run_sweeper(interval_sec: Optional[int] = None) -> None:
+    """lifespan에서 태스크로 띄우고, 종료 시 cancel"""
+    interval = interval_sec or DOCX_SWEEP_INTERVAL_SEC
+    while True:
+        files, freed = await run_io(sweep_expired)
+        if files:
+            log.info("docx copies removed", extra={"files": files, "reclaimed_bytes": freed, "dir": DOCX_OUTPUT_DIR})
+        await asyncio.sleep(interval)
@@ -0,0 +1,32 @@
+import os
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# 이벤트 루프를 막지 않도록 블로킹 작업을 전용 풀에서 실행
+# - CPU 풀: OpenCV 이진화, python-docx 생성/저장 (OpenCV는 GIL을 풀어준다)
+# - IO 풀: S3/HTTP 다운로드, 동기 번역 클라이언트 등
+# 호출한 쪽의 contextvars(요청별 타이밍 등)를 복사해서 워커 스레드에서 실행한다
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(os.cpu_count() or 2)))
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "64"))
+
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_POOL_WORKERS, thread_name_prefix="cpu")
+_io_pool = ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix="io")
+
+
+async def run_cpu(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_cpu_pool, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+async def run_io(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_io_pool, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def shutdown_executors() -> None:
+    _cpu_pool.shutdown(wait=False, cancel_futures=True)
+    _io_pool.shutdown(wait=False, cancel_futures=True)
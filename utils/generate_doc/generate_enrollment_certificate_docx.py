@@ -1,44 +1,10 @@
 from docx import Document
+from utils.generate_doc.template_registry import enrollment_template_path, open_template
+from utils.generate_doc.placeholder import render_document, render_paragraphs
 import json
-import re
-
-def has_drawing(run):
-    return bool(run._element.xpath('.//w:drawing') or run._element.xpath('.//w:pict'))
 
 def replace_in_runs(paragraphs, replacements: dict):
-    if not isinstance(replacements, dict):
-        raise TypeError("replacements는 dict여야 합니다. (키=플레이스홀더, 값=치환문자열)")
-
-    for para in paragraphs:
-        if not para.runs:
-            continue
-        text_runs, drawing_runs = [], []
-        for run in para.runs:
-            (drawing_runs if has_drawing(run) else text_runs).append(run)
-
-        # 텍스트 run 병합 후 치환
-        buffer = "".join(r.text for r in text_runs)
-        for key, val in replacements.items():
-            pattern = r"\{\{\s*" + re.escape(str(key)) + r"\s*\}\}"
-            buffer = re.sub(pattern, "" if val is None else str(val), buffer)
-
-        # 기존 텍스트 run 제거
-        for run in text_runs:
-            para._element.remove(run._element)
-
-        # 새 텍스트 run 삽입
-        if text_runs:
-            first = text_runs[0]
-            new_run = para.add_run(buffer)
-            new_run.style = first.style
-            new_run.font.size = first.font.size
-            new_run.bold = first.bold
-            new_run.italic = first.italic
-            new_run.underline = first.underline
-
-        # 도형 run 원래 순서 유지
-        for run in drawing_runs:
-            para._element.append(run._element)
+    render_paragraphs(paragraphs, replacements)
 
 def _normalize_replacements(obj):
     """
@@ -73,22 +39,14 @@ def generate_enrollment_certificate_docx(json_path: str, lang: str) -> Document:
         raw = json.load(f)
     replacements = _normalize_replacements(raw)
 
-    # 템플릿 선택
-    if lang == "일본어":
-        tpl = "templates/japanese_template_enrollment_certificate.docx"
-    elif lang == "중국어":
-        tpl = "templates/chinese_template_enrollment_certificate.docx"
-    elif lang == "베트남어":
-        tpl = "templates/vietnamese_template_enrollment_certificate.docx"
-    else:
-        tpl = "templates/english_template_enrollment_certificate.docx"
+    # 템플릿 선택 (미리 읽어 둔 템플릿의 복제본)
+    tpl = enrollment_template_path(lang)
+    doc = open_template(tpl)
 
-    doc = Document(tpl)
+    if not isinstance(replacements, dict):
+        raise TypeError("replacements는 dict여야 합니다. (키=플레이스홀더, 값=치환문자열)")
 
-    # 본문
-    replace_in_runs(doc.paragraphs, replacements)
-    #머리말
-    for section in doc.sections:
-        replace_in_runs(section.header.paragraphs, replacements)
+    # 본문 + 표 + 머리말/꼬리말
+    render_document(doc, replacements)
 
     return doc
\ No newline at end of file
@@ -0,0 +1,93 @@
+import re
+from copy import deepcopy
+from typing import Any, Dict, Iterable
+
+from docx.oxml.ns import qn
+
+# {{ key }} 플레이스홀더 치환 엔진 (모든 템플릿 기반 문서 공용)
+# - 패턴 하나로 한 번에 토큰화하고 dict 조회로 치환 → 문단당 O(플레이스홀더 수)
+# - {{ 가 없는 문단은 run을 건드리지 않는다 (서식도 그대로 유지)
+# - 본문, 표(중첩 표 포함), 머리말/꼬리말 모두 처리
+_PLACEHOLDER = re.compile(r"\{\{\s*([^{}]*?)\s*\}\}")
+_W_T = qn("w:t")
+# 새 run에 옮겨 줄 서식 (스타일/크기/굵게/기울임/밑줄), 스키마 순서대로
+_KEEP_RPR = tuple(qn(t) for t in ("w:rStyle", "w:b", "w:i", "w:sz", "w:u"))
+
+
+def has_drawing(run):
+    return bool(run._element.xpath('.//w:drawing') or run._element.xpath('.//w:pict'))
+
+
+def _prepare(replacements: Dict[Any, Any]) -> Dict[str, str]:
+    return {str(k): "" if v is None else str(v) for k, v in replacements.items()}
+
+
+def _substitute(text: str, values: Dict[str, str]) -> str:
+    # 없는 키는 원문({{ key }}) 그대로 둔다
+    return _PLACEHOLDER.sub(lambda m: values.get(m.group(1), m.group(0)), text)
+
+
+def _has_placeholder(para) -> bool:
+    return "{{" in "".join(t.text or "" for t in para._p.iter(_W_T))
+
+
+def _render_paragraph(para, values: Dict[str, str]) -> None:
+    if not _has_placeholder(para):
+        return
+    text_runs, drawing_runs = [], []
+    for run in para.runs:
+        (drawing_runs if has_drawing(run) else text_runs).append(run)
+    if not text_runs:
+        return
+
+    # 텍스트 run 병합 후 치환 (플레이스홀더가 여러 run에 걸쳐 있어도 처리)
+    buffer = _substitute("".join(r.text for r in text_runs), values)
+
+    # 기존 텍스트 run 제거
+    for run in text_runs:
+        para._element.remove(run._element)
+
+    # 새 텍스트 run 삽입 (첫 run 서식 유지)
+    # run.style 등 고수준 API는 호출마다 styles.xml을 뒤지므로 rPr 요소를 직접 복사한다
+    new_run = para.add_run(buffer)
+    first_rpr = text_runs[0]._r.rPr
+    if first_rpr is not None:
+        kept = [child for tag in _KEEP_RPR for child in first_rpr.findall(tag)]
+        if kept:
+            rpr = new_run._r.get_or_add_rPr()
+            for child in kept:
+                rpr.append(deepcopy(child))
+
+    # 도형 run 원래 순서 유지
+    for run in drawing_runs:
+        para._element.append(run._element)
+
+
+def _iter_paragraphs(container) -> Iterable:
+    """문단 + 표 셀 안의 문단(중첩 표 포함)"""
+    yield from container.paragraphs
+    for table in getattr(container, "tables", []):
+        for row in table.rows:
+            for cell in row.cells:
+                yield from _iter_paragraphs(cell)
+
+
+def render_paragraphs(paragraphs, replacements: Dict[Any, Any]) -> None:
+    values = _prepare(replacements)
+    for para in paragraphs:
+        _render_paragraph(para, values)
+
+
+def render_document(doc, replacements: Dict[Any, Any]) -> None:
+    values = _prepare(replacements)
+    for para in _iter_paragraphs(doc):
+        _render_paragraph(para, values)
+
+    for section in doc.sections:
+        for part in (section.header, section.first_page_header, section.even_page_header,
+                     section.footer, section.first_page_footer, section.even_page_footer):
+            # 이전 구역에 연결된 머리말/꼬리말은 정의가 없으므로 건너뛴다 (접근하면 새로 생성됨)
+            if part.is_linked_to_previous:
+                continue
+            for para in _iter_paragraphs(part):
+                _render_paragraph(para, values)
@@ -0,0 +1,53 @@
+import io
+import os
+import copy
+import threading
+from typing import Dict
+
+from docx import Document
+
+# 언어별 .docx 템플릿을 시작할 때 한 번만 읽어 두고, 요청마다 복제본을 돌려준다
+# - copy: 파싱된 Document를 deepcopy (기본, 가장 빠름)
+# - bytes: 캐시한 파일 바이트를 BytesIO로 다시 연다
+TEMPLATE_CLONE_MODE = os.getenv("TEMPLATE_CLONE_MODE", "copy")
+
+ENROLLMENT_TEMPLATES = {
+    "일본어": "templates/japanese_template_enrollment_certificate.docx",
+    "중국어": "templates/chinese_template_enrollment_certificate.docx",
+    "베트남어": "templates/vietnamese_template_enrollment_certificate.docx",
+    "영어": "templates/english_template_enrollment_certificate.docx",
+}
+
+_bytes: Dict[str, bytes] = {}
+_docs: Dict[str, Document] = {}
+_lock = threading.Lock()
+
+
+def enrollment_template_path(lang: str) -> str:
+    return ENROLLMENT_TEMPLATES.get(lang, ENROLLMENT_TEMPLATES["영어"])
+
+
+def _load(path: str) -> None:
+    with open(path, "rb") as f:
+        data = f.read()
+    _bytes[path] = data
+    _docs[path] = Document(io.BytesIO(data))
+
+
+def preload_templates() -> None:
+    with _lock:
+        for path in ENROLLMENT_TEMPLATES.values():
+            if path not in _bytes:
+                _load(path)
+
+
+def open_template(path: str) -> Document:
+    """캐시된 템플릿의 독립적인 복제본 (수정해도 원본에 영향 없음)"""
+    with _lock:
+        if path not in _bytes:
+            _load(path)
+        if TEMPLATE_CLONE_MODE == "bytes":
+            data = _bytes[path]
+        else:
+            return copy.deepcopy(_docs[path])
+    return Document(io.BytesIO(data))
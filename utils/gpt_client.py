@@ -1,17 +1,34 @@
 import openai
 import base64
-from typing import List
+import hashlib
+import json
+import logging
+from typing import List, Union
 from dotenv import load_dotenv
 from utils.clean_gpt_response import clean_gpt_response
+from utils.async_clients import create_chat_completion
+from utils.executors import run_cpu
+from utils.metrics import VISION_IMAGE_BYTES, record_openai, record_openai_error
+from utils.vision_preprocess import (
+    DEFAULT_PROFILE, VISION_IMAGE_FORMAT, VISION_PREPROCESS, VISION_PROFILES, prepare_vision_image,
+)
 import os
 
 load_dotenv()  # .env 파일 로드
 
 gpt_api_key = os.getenv("GPT-API-KEY")
 
-def encode_images_to_base64(image_paths:List[str]) -> List[str]:
+MODEL = "gpt-4o"
+
+log = logging.getLogger(__name__)
+
+# 경로(str) 또는 이미 메모리에 있는 PNG 바이트를 모두 받는다
+def encode_images_to_base64(image_paths:List[Union[str, bytes]]) -> List[str]:
     encoded_images = []
     for path in image_paths:
+        if isinstance(path, (bytes, bytearray)):
+            encoded_images.append(base64.b64encode(path).decode("utf-8"))
+            continue
         with open(path, "rb") as img_file:
             b64 = base64.b64encode(img_file.read()).decode("utf-8")
             encoded_images.append(b64)
@@ -193,27 +210,82 @@ def get_prompts_by_doc_type(doc_type:str) -> tuple[str,str]:
     else:
         raise ValueError("지원하지 않는 문서 유형입니다.")
 
-def call_gpt_for_structured_json(image_paths: List[str], doc_type:str) -> str:
-    encoded_images = encode_images_to_base64(image_paths)
+# 결과 캐시 키에 쓰는 프롬프트 버전 (프롬프트/모델/비전 전처리 설정이 바뀌면 캐시도 무효화)
+def prompt_version(doc_type: str) -> str:
+    vision = [VISION_PREPROCESS, VISION_IMAGE_FORMAT, VISION_PROFILES.get(doc_type, DEFAULT_PROFILE)]
+    raw = json.dumps([MODEL, get_prompts_by_doc_type(doc_type), vision], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def _read_image(path: Union[str, bytes]) -> bytes:
+    if isinstance(path, (bytes, bytearray)):
+        return bytes(path)
+    with open(path, "rb") as img_file:
+        return img_file.read()
+
+def _encode_for_vision(image_paths: List[Union[str, bytes]], doc_type: str) -> List[str]:
+    """이미지를 data URL로 변환. VISION_PREPROCESS면 크롭/축소/압축 후 절감량을 기록한다
+    (이미지별 전후 크기는 lingo_vision_image_bytes, 요청별 합계는 INFO 로그)."""
+    if not VISION_PREPROCESS:
+        return [f"data:image/png;base64,{b64}" for b64 in encode_images_to_base64(image_paths)]
+
+    urls = []
+    total = {"bytes_before": 0, "bytes_after": 0, "tokens_before": 0, "tokens_after": 0}
+    for path in image_paths:
+        data, mime, stats = prepare_vision_image(_read_image(path), doc_type)
+        for k in total:
+            total[k] += stats[k]
+        VISION_IMAGE_BYTES.observe(stats["bytes_before"], doc_type=doc_type, stage="before")
+        VISION_IMAGE_BYTES.observe(stats["bytes_after"], doc_type=doc_type, stage="after")
+        urls.append(f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}")
+    log.info("vision inputs prepared", extra={"doc_type": doc_type, "images": len(urls), **total})
+    return urls
+
+def _build_messages(image_paths: List[Union[str, bytes]], doc_type: str) -> list:
+    image_urls = _encode_for_vision(image_paths, doc_type)
     system_prompt, user_text = get_prompts_by_doc_type(doc_type)
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {
             "role": "user",
             "content": [
                 {"type": "text", "text": user_text},
-                *[{"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64}"}} for b64 in encoded_images]
+                *[{"type": "image_url", "image_url": {"url": url}} for url in image_urls]
             ]
         }
     ]
 
-    response = openai.chat.completions.create(
-        model="gpt-4o",
-        messages=messages
-    )
+def call_gpt_for_structured_json(image_paths: List[str], doc_type:str) -> str:
+    messages = _build_messages(image_paths, doc_type)
+
+    try:
+        response = openai.chat.completions.create(
+            model=MODEL,
+            messages=messages
+        )
+    except openai.APIError as e:
+        record_openai_error(e)
+        raise
+    record_openai(response, doc_type=doc_type)
 
     raw_result = response.choices[0].message.content
     clean_result = clean_gpt_response(raw_result)
 
-    return clean_result
\ No newline at end of file
+    return clean_result
+
+async def call_gpt_for_structured_json_async(image_paths: List[Union[str, bytes]], doc_type: str) -> str:
+    # 이미지 전처리는 CPU 작업이므로 이벤트 루프 밖에서
+    messages = await run_cpu(_build_messages, image_paths, doc_type)
+
+    try:
+        response = await create_chat_completion(
+            model=MODEL,
+            messages=messages
+        )
+    except openai.APIError as e:
+        record_openai_error(e)
+        raise
+    record_openai(response, doc_type=doc_type)
+
+    raw_result = response.choices[0].message.content
+    return clean_gpt_response(raw_result)
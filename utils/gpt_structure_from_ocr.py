@@ -1,12 +1,17 @@
 import json
 import os
+import hashlib
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 import openai
+from utils.async_clients import create_chat_completion
+from utils.metrics import record_openai, record_openai_error
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY") or os.getenv("GPT-API-KEY")
 
+MODEL = "gpt-4o"
+
 
 def _cell_text(cell: Dict[str, Any]) -> str:
     """
@@ -206,38 +211,43 @@ def get_prompts_by_doc_type(doc_type: str) -> tuple[str, str]:
         )
    
 
-def call_gpt_for_structured_from_ocr(ocr_list: List[Dict[str, Any]], doc_type: str) -> str:
+_EXTRA_RULES = (
+    "\n\n[중요 추가 규칙]\n"
+    "- documentType은 OCR 상단 제목을 그대로 사용하고 예시의 '등기부등본' 등으로 대체 금지\n"
+    "- 표의 모든 셀 텍스트( cell.text 가 비면 cell.rawWords )를 절대 누락하지 말고 JSON에 반영할 것.\n"
+    "- 표 병합/행·열 의미 유지, 누락 없이 rows[][]에 모두 채움\n"
+    "- 표 밖 줄글/참고문구는 remarks[]에 순서대로 모두 포함\n"
+    "- 번역/요약/정규화 금지, 원문 그대로\n"
+)
+
+
+# 결과 캐시 키에 쓰는 프롬프트 버전 (프롬프트나 모델이 바뀌면 캐시도 무효화)
+def prompt_version(doc_type: str) -> str:
+    raw = json.dumps([MODEL, get_prompts_by_doc_type(doc_type), _EXTRA_RULES], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
 
+def _build_messages(ocr_list: List[Dict[str, Any]], doc_type: str) -> list:
     summarized = [_summarize_ocr_result(item) for item in ocr_list]
 
     system_prompt, user_example_text = get_prompts_by_doc_type(doc_type)
 
     user_payload = {
-        "instruction": (
-            user_example_text
-            + "\n\n[중요 추가 규칙]\n"
-              "- documentType은 OCR 상단 제목을 그대로 사용하고 예시의 '등기부등본' 등으로 대체 금지\n"
-              "- 표의 모든 셀 텍스트( cell.text 가 비면 cell.rawWords )를 절대 누락하지 말고 JSON에 반영할 것.\n"
-              "- 표 병합/행·열 의미 유지, 누락 없이 rows[][]에 모두 채움\n"
-              "- 표 밖 줄글/참고문구는 remarks[]에 순서대로 모두 포함\n"
-              "- 번역/요약/정규화 금지, 원문 그대로\n"
-        ),
+        "instruction": user_example_text + _EXTRA_RULES,
         "ocr_summary": summarized
     }
 
-    resp = openai.chat.completions.create(
-        model="gpt-4o",
-        temperature=0,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": [
-                {"type": "text", "text": json.dumps(user_payload, ensure_ascii=False)}
-            ]},
-        ],
-    )
-    text = (resp.choices[0].message.content or "").strip()
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": [
+            {"type": "text", "text": json.dumps(user_payload, ensure_ascii=False)}
+        ]},
+    ]
 
 
+def _parse_structured_text(text: str) -> str:
+    text = (text or "").strip()
+
     if text.startswith("```json"):
         text = text[len("```json"):].lstrip()
     if text.endswith("```"):
@@ -253,4 +263,34 @@ def call_gpt_for_structured_from_ocr(ocr_list: List[Dict[str, Any]], doc_type: s
 
     parsed = _merge_continuations_in_struct(parsed)
 
-    return json.dumps(parsed, ensure_ascii=False, indent=2)
\ No newline at end of file
+    return json.dumps(parsed, ensure_ascii=False, indent=2)
+
+
+def call_gpt_for_structured_from_ocr(ocr_list: List[Dict[str, Any]], doc_type: str) -> str:
+
+    try:
+        resp = openai.chat.completions.create(
+            model=MODEL,
+            temperature=0,
+            messages=_build_messages(ocr_list, doc_type),
+        )
+    except openai.APIError as e:
+        record_openai_error(e)
+        raise
+    record_openai(resp, doc_type=doc_type)
+    return _parse_structured_text(resp.choices[0].message.content)
+
+
+async def call_gpt_for_structured_from_ocr_async(ocr_list: List[Dict[str, Any]], doc_type: str) -> str:
+
+    try:
+        resp = await create_chat_completion(
+            model=MODEL,
+            temperature=0,
+            messages=_build_messages(ocr_list, doc_type),
+        )
+    except openai.APIError as e:
+        record_openai_error(e)
+        raise
+    record_openai(resp, doc_type=doc_type)
+    return _parse_structured_text(resp.choices[0].message.content)
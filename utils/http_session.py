@@ -0,0 +1,154 @@
+import os
+import random
+import asyncio
+import threading
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.metrics import record_retry, record_upstream, upstream_for
+
+# CLOVA OCR / 이미지 호스트 호출이 공유하는 커넥션 풀 설정
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "10"))
+
+RETRY_STATUS = (500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# httpx 쪽 연결 재사용 집계 (trace 이벤트 기반)
+_async_stats = {"requests": 0, "connections": 0, "tls_handshakes": 0, "retries": 0}
+
+
+def timeout(read: Optional[float] = None):
+    """requests용 (connect, read) 타임아웃 튜플"""
+    return (HTTP_CONNECT_TIMEOUT, read if read is not None else HTTP_READ_TIMEOUT)
+
+
+def async_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    """httpx용. 읽기 시간만 바꾸고 연결 타임아웃은 HTTP_CONNECT_TIMEOUT 유지 (숫자 하나를 넘기면 연결까지 바뀐다)"""
+    return httpx.Timeout(read if read is not None else HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+class _CountingRetry(Retry):
+    """urllib3 내부 재시도도 /metrics에 잡히도록"""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if _pool is not None:
+            record_retry(upstream_for(f"{_pool.scheme}://{_pool.host}"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def _content_length(headers) -> int:
+    try:
+        return int(headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+
+def _record_response(resp: requests.Response, *args, **kwargs) -> None:
+    # stream=True 응답을 소비하지 않도록 크기는 헤더 기준
+    body = resp.request.body
+    sent = len(body) if isinstance(body, (bytes, str)) else 0
+    record_upstream(upstream_for(resp.url), resp.status_code, sent, _content_length(resp.headers))
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = _CountingRetry(
+                total=HTTP_MAX_RETRIES,
+                connect=HTTP_MAX_RETRIES,
+                read=HTTP_MAX_RETRIES,
+                status=HTTP_MAX_RETRIES,
+                status_forcelist=RETRY_STATUS,
+                # OCR 업로드(POST)도 재시도 대상
+                allowed_methods=frozenset({"GET", "HEAD", "POST"}),
+                backoff_factor=HTTP_BACKOFF,
+                backoff_max=HTTP_BACKOFF_MAX,
+                backoff_jitter=HTTP_BACKOFF,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            s = requests.Session()
+            s.hooks["response"].append(_record_response)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _session = s
+        return _session
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _async_stats["connections"] += 1
+    elif event_name == "connection.start_tls.complete":
+        _async_stats["tls_handshakes"] += 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _async_stats["requests"] += 1
+    request.extensions["trace"] = _trace
+
+
+async def _on_response(response: httpx.Response) -> None:
+    request = response.request
+    record_upstream(upstream_for(str(request.url)), response.status_code,
+                    _content_length(request.headers), _content_length(response.headers))
+
+
+def new_async_client() -> httpx.AsyncClient:
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+        retries=HTTP_MAX_RETRIES,  # 연결 실패만 재시도
+    )
+    return httpx.AsyncClient(
+        timeout=async_timeout(),
+        transport=transport,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+def _backoff(attempt: int) -> float:
+    base = min(HTTP_BACKOFF * (2 ** attempt), HTTP_BACKOFF_MAX)
+    return base + random.uniform(0, HTTP_BACKOFF)
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """5xx / 연결 끊김에 jitter backoff로 재시도. 마지막 응답(또는 예외)을 그대로 돌려준다."""
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except (httpx.ConnectError, httpx.ReadError, httpx.RemoteProtocolError, httpx.WriteError):
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        else:
+            if resp.status_code not in RETRY_STATUS or attempt == HTTP_MAX_RETRIES:
+                return resp
+        _async_stats["retries"] += 1
+        record_retry(upstream_for(url))
+        await asyncio.sleep(_backoff(attempt))
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """요청 수 대비 새 연결 수. requests가 connections보다 훨씬 크면 핸드셰이크가 재사용되고 있다는 뜻."""
+    sync = {"requests": 0, "connections": 0, "pools": 0}
+    if _session is not None:
+        # http://, https:// 가 같은 어댑터를 공유하므로 한 번씩만 센다
+        for adapter in {id(a): a for a in _session.adapters.values()}.values():
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                sync["pools"] += 1
+                sync["requests"] += pool.num_requests
+                sync["connections"] += pool.num_connections
+    return {"sync": sync, "async": dict(_async_stats)}
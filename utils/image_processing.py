@@ -1,21 +1,180 @@
-def binarize_image(image_path: str, save_dir: str) -> str:
-    import cv2, os
+import os
+import json
+import hashlib
+from typing import Optional, Tuple
 
+import cv2
+import numpy as np
+
+# 이진화 엔진 버전. 처리 방식이 바뀌면 올린다 (프로필과 함께 OCR/GPT 결과 캐시 키에 들어감)
+BINARIZE_VERSION = "adaptive-v1"
+# 모든 문서 유형에 강제로 적용할 방식 (global | otsu | adaptive | sauvola). 비우면 문서별 프로필 사용
+BINARIZE_METHOD = os.getenv("BINARIZE_METHOD", "")
+
+# 문서 유형별 전처리 프로필
+# - method: global(기존 고정 200) / otsu / adaptive(국소 평균 - c) / sauvola(국소 평균·표준편차)
+# - window: adaptive/sauvola 주변 창 크기(px, 홀수), k: sauvola 민감도, c: adaptive 보정값
+# - deskew: 표 선/글자 줄 기울기를 추정해서 바로 세움 (±MAX_SKEW_DEG 이내만)
+# - crop_border: 스캔할 때 생긴 가장자리 검은 띠 제거
+# - denoise: 3x3 median (휴대폰 촬영본의 점 잡음)
+# 등기부는 표 선이 많고 음영이 고르지 않은 사본이 많아 sauvola, 휴대폰 촬영이 많은 증명서는 adaptive + denoise
+BINARIZE_PROFILES = {
+    "부동산등기부등본": {"method": "sauvola", "window": 41, "k": 0.2, "deskew": True, "crop_border": True, "denoise": False},
+    "가족관계증명서": {"method": "adaptive", "window": 41, "c": 15, "deskew": True, "crop_border": True, "denoise": True},
+    "재학증명서": {"method": "adaptive", "window": 41, "c": 15, "deskew": True, "crop_border": True, "denoise": True},
+}
+DEFAULT_BINARIZE_PROFILE = {"method": "sauvola", "window": 41, "k": 0.2, "deskew": True, "crop_border": True,
+                            "denoise": False}
+MAX_SKEW_DEG = 10.0
+# 기울기/테두리/국소 통계는 1/ANALYSIS_SCALE로 줄인 이미지에서 계산한다 (전체 해상도에서는 비교/회전만)
+ANALYSIS_SCALE = 4
+
+
+def _profile(doc_type: Optional[str]) -> dict:
+    profile = dict(BINARIZE_PROFILES.get(doc_type, DEFAULT_BINARIZE_PROFILE))
+    if BINARIZE_METHOD:
+        profile["method"] = BINARIZE_METHOD
+    return profile
+
+
+def binarize_version(doc_type: Optional[str] = None) -> str:
+    """캐시 키용: 엔진 버전 + 해당 문서 유형 프로필"""
+    profile = json.dumps(_profile(doc_type), sort_keys=True)
+    return f"{BINARIZE_VERSION}-{hashlib.sha256(profile.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _odd(n: int) -> int:
+    return max(3, int(n) | 1)
+
+
+def _downscale(gray: np.ndarray) -> Tuple[np.ndarray, int]:
+    scale = ANALYSIS_SCALE if min(gray.shape[:2]) >= 100 * ANALYSIS_SCALE else 1
+    if scale == 1:
+        return gray, 1
+    return cv2.resize(gray, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA), scale
+
+
+def _local_threshold(gray: np.ndarray, small: np.ndarray, scale: int, profile: dict) -> np.ndarray:
+    # 국소 평균/표준편차를 작은 이미지에서 구하고, 임계값 맵만 원래 크기로 키워서 비교
+    win = (_odd(profile.get("window", 41) / scale),) * 2
+    f = small.astype(np.float32)
+    mean = cv2.boxFilter(f, -1, win, borderType=cv2.BORDER_REPLICATE)
+    if profile["method"] == "adaptive":
+        thresh = mean - profile.get("c", 15)
+    else:
+        # sauvola: T = m * (1 + k * (s / R - 1)), R = 128
+        sq_mean = cv2.sqrBoxFilter(f, -1, win, borderType=cv2.BORDER_REPLICATE)
+        std = np.sqrt(np.maximum(sq_mean - mean * mean, 0))
+        thresh = mean * (1 + profile.get("k", 0.2) * (std / 128.0 - 1))
+    thresh = np.clip(thresh, 0, 255).astype(np.uint8)
+    if scale > 1:
+        thresh = cv2.resize(thresh, (gray.shape[1], gray.shape[0]), interpolation=cv2.INTER_LINEAR)
+    return cv2.compare(gray, thresh, cv2.CMP_GT)
+
+
+def _threshold(gray: np.ndarray, profile: dict, small: Optional[np.ndarray] = None, scale: int = 1) -> np.ndarray:
+    method = profile["method"]
+    if method == "global":
+        # 기존 방식: 200 이상이면 흰색
+        _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+    elif method == "otsu":
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    elif method in ("adaptive", "sauvola"):
+        if small is None:
+            small, scale = _downscale(gray)
+        binary = _local_threshold(gray, small, scale, profile)
+    else:
+        raise ValueError(f"지원하지 않는 이진화 방식입니다: {method}")
+    return binary
+
+
+def _ink(small: np.ndarray) -> np.ndarray:
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    return ink
+
+
+def _border_bounds(ink: np.ndarray, dark_ratio: float = 0.6) -> Optional[Tuple[int, int, int, int]]:
+    """가장자리에서부터 대부분 검은 행/열(스캔 테두리)을 뺀 범위 (r0, r1, c0, c1), 끝은 미포함"""
+    rows = np.flatnonzero(np.count_nonzero(ink, axis=1) < dark_ratio * ink.shape[1])
+    cols = np.flatnonzero(np.count_nonzero(ink, axis=0) < dark_ratio * ink.shape[0])
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+
+def _estimate_skew(ink: np.ndarray) -> float:
+    """수평 투영 프로파일이 가장 뾰족해지는 각도(도, 이미지 좌표 기준). 글자 줄/표 선 모두에 반응"""
+    ys, xs = np.nonzero(ink)
+    if ys.size < 100:
+        return 0.0
+    step = max(1, ys.size // 20000)
+    ys, xs = ys[::step].astype(np.float32), xs[::step].astype(np.float32)
+
+    def best(angles: np.ndarray) -> float:
+        # 모든 각도를 한 번의 bincount로: 각도마다 (y - x·tanθ) 행 히스토그램 → 제곱합이 최대인 각도
+        shifted = ys[None, :] - xs[None, :] * np.tan(np.radians(angles))[:, None]
+        bins = np.rint(shifted).astype(np.int64)
+        bins -= bins.min()
+        width = int(bins.max()) + 1
+        hist = np.bincount((bins + np.arange(len(angles))[:, None] * width).ravel(),
+                           minlength=len(angles) * width).reshape(len(angles), width)
+        return float(angles[np.argmax((hist.astype(np.float64) ** 2).sum(axis=1))])
+
+    coarse = best(np.arange(-MAX_SKEW_DEG, MAX_SKEW_DEG + 1e-6, 0.5))
+    return best(np.arange(coarse - 0.5, coarse + 0.5 + 1e-6, 0.05))
+
+
+def _rotate(binary: np.ndarray, angle: float) -> np.ndarray:
+    h, w = binary.shape[:2]
+    m = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    # 이미 0/255이므로 최근접 보간으로 충분하고 선형 보간보다 훨씬 빠르다
+    return cv2.warpAffine(binary, m, (w, h), flags=cv2.INTER_NEAREST,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+
+def preprocess(gray: np.ndarray, doc_type: Optional[str] = None) -> np.ndarray:
+    """그레이스케일 → (테두리 제거) → (denoise) → 이진화 → (deskew). 결과는 0/255 uint8"""
+    profile = _profile(doc_type)
+    small, scale = _downscale(gray)
+    ink = _ink(small) if profile.get("crop_border") or profile.get("deskew") else None
+
+    if profile.get("crop_border"):
+        bounds = _border_bounds(ink)
+        if bounds is not None:
+            r0, r1, c0, c1 = bounds
+            gray = gray[r0 * scale:r1 * scale, c0 * scale:c1 * scale]
+            small, ink = small[r0:r1, c0:c1], ink[r0:r1, c0:c1]
+    if profile.get("denoise"):
+        gray = cv2.medianBlur(gray, 3)
+
+    binary = _threshold(gray, profile, small, scale)
+
+    if profile.get("deskew"):
+        angle = _estimate_skew(ink)
+        if abs(angle) >= 0.1:
+            binary = _rotate(binary, angle)
+    return binary
+
+
+def _encode_png(binary: np.ndarray) -> bytes:
+    # 0/255만 있으므로 1비트 PNG로 저장 (OCR/GPT로 보내는 용량 감소)
+    ok, buf = cv2.imencode(".png", binary, [cv2.IMWRITE_PNG_BILEVEL, 1])
+    if not ok:
+        raise RuntimeError("이미지 인코딩 실패")
+    return buf.tobytes()
+
+
+def binarize_image(image_path: str, save_dir: str, doc_type: Optional[str] = None) -> str:
     # 이미지 파일이 존재하는지 확인
     if not os.path.exists(image_path):
         raise FileNotFoundError("이미지 경로가 존재하지 않습니다.")
 
-    # 이미지를 OpenCV로 읽어옴 (기본은 컬러)
-    img = cv2.imread(image_path)
-    if img is None:
+    # 이미지를 흑백으로 읽어옴
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
         raise ValueError("이미지를 불러올 수 없습니다.")  # 경로는 있지만 형식이 잘못됐을 수도 있음
 
-    # 이미지 → 흑백(Grayscale)으로 변환
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-    # 흑백 이미지 → 이진화 (픽셀 값을 0 또는 255로 분리)
-    # threshold 값 200 이상이면 255(흰색), 그 이하면 0(검정)
-    _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+    binary = preprocess(gray, doc_type)
 
     # 결과 저장 폴더가 없으면 생성
     os.makedirs(save_dir, exist_ok=True)
@@ -25,10 +184,16 @@ def binarize_image(image_path: str, save_dir: str) -> str:
     binary_path = os.path.join(save_dir, f"{base_name}_binary.png")
 
     # 이진화된 이미지를 파일로 저장
-    success = cv2.imwrite(binary_path, binary)
-
-    if not success:
-        raise RuntimeError(f"이미지 저장 실패: {binary_path}")
+    with open(binary_path, "wb") as f:
+        f.write(_encode_png(binary))
 
     # 저장된 이진화 이미지 경로 반환
     return binary_path
+
+
+# 인메모리 버전: 다운로드한 바이트 → imdecode → 전처리 → PNG 바이트 (디스크 왕복 없음)
+def binarize_image_bytes(data: bytes, doc_type: Optional[str] = None) -> bytes:
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("이미지를 불러올 수 없습니다.")
+    return _encode_png(preprocess(gray, doc_type))
@@ -0,0 +1,116 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, Optional, Set
+
+from utils.executors import run_io
+from utils.logging_setup import bind_session_id
+from utils.job_store import JobStore, make_job_store
+from utils.pipeline import run_structuring_pipeline
+
+STAGES = ("download", "binarize", "ocr", "gpt")
+# 단계별 동시 실행 한도 (모든 잡이 공유). 예: "download=16,binarize=4,ocr=8,gpt=4"
+JOB_STAGE_LIMITS = os.getenv("JOB_STAGE_LIMITS", "download=16,binarize=4,ocr=8,gpt=4")
+# 동시에 실행되는 잡 수 (나머지는 queued 상태로 대기)
+JOB_MAX_CONCURRENT = int(os.getenv("JOB_MAX_CONCURRENT", "8"))
+
+log = logging.getLogger(__name__)
+
+
+def _parse_stage_limits(spec: str) -> Dict[str, int]:
+    limits = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, n = part.split("=", 1)
+        limits[name.strip()] = max(1, int(n))
+    return limits
+
+
+class JobRunner:
+    def __init__(self, store: Optional[JobStore] = None, stage_limits: Optional[Dict[str, int]] = None,
+                 max_concurrent_jobs: int = JOB_MAX_CONCURRENT):
+        self.store = store or make_job_store()
+        limits = stage_limits if stage_limits is not None else _parse_stage_limits(JOB_STAGE_LIMITS)
+        self._stage_sems = {name: asyncio.Semaphore(n) for name, n in limits.items()}
+        self._job_sem = asyncio.Semaphore(max(1, max_concurrent_jobs))
+        self._tasks: Set[asyncio.Task] = set()
+        # 저장소 쓰기는 IO 풀에서 하되, 요청한 순서대로 반영되도록 하나씩
+        self._write_lock = asyncio.Lock()
+
+    async def _save(self, job_id: str, **fields) -> None:
+        async with self._write_lock:
+            # 단계 진행 dict는 루프에서 계속 바뀌므로 차례가 왔을 때의 상태를 복사해서 넘긴다
+            fields = json.loads(json.dumps(fields))
+            await run_io(self.store.update, job_id, **fields)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await run_io(self.store.get, job_id)
+
+    async def submit(self, image_paths, doc_type: str) -> str:
+        job_id = str(uuid.uuid4())
+        await run_io(self.store.create, job_id, {"image_paths": list(image_paths), "doc_type": doc_type})
+        task = asyncio.create_task(self._run(job_id, list(image_paths), doc_type))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    def _stage_factory(self, job_id: str, stages: Dict[str, Dict[str, Any]]):
+        @asynccontextmanager
+        async def stage(name: str):
+            sem = self._stage_sems.get(name)
+            progress = stages.setdefault(name, {"running": 0, "done": 0})
+            if sem is not None:
+                await sem.acquire()
+            try:
+                progress["running"] += 1
+                await self._save(job_id, stage=name, stages=stages)
+                yield
+                progress["done"] += 1
+            finally:
+                progress["running"] -= 1
+                if sem is not None:
+                    sem.release()
+                await self._save(job_id, stages=stages)
+        return stage
+
+    async def _run(self, job_id: str, image_paths, doc_type: str) -> None:
+        # 이 태스크의 로그에는 잡 id를 세션 id로 붙인다
+        bind_session_id(job_id)
+        async with self._job_sem:
+            # 잡 id를 세션 id로 사용 → outputs/<job_id>/
+            output_dir = os.path.join("outputs", job_id)
+            stages: Dict[str, Dict[str, Any]] = {}
+            await self._save(job_id, status="running", total_pages=len(image_paths))
+            try:
+                path = await run_structuring_pipeline(
+                    image_paths, doc_type, job_id, output_dir,
+                    stage=self._stage_factory(job_id, stages),
+                )
+                await self._save(job_id, status="succeeded", stage=None, result={"path": path})
+            except asyncio.CancelledError:
+                # 취소 중에는 await가 다시 취소될 수 있으므로 상태 기록은 직접
+                self.store.update(job_id, status="failed", error="cancelled")
+                raise
+            except Exception as e:
+                log.exception("job failed", extra={"doc_type": doc_type})
+                await self._save(job_id, status="failed", error=str(e))
+
+    async def expire(self, sessions: Iterable[str]) -> int:
+        """보존 정책으로 outputs/<session>/이 지워졌을 때 호출. 그 세션이 결과였던 잡을 expired로"""
+        expired = 0
+        for job_id in sessions:
+            job = await self.get(job_id)
+            if job is None or job["status"] != "succeeded":
+                continue
+            await self._save(job_id, status="expired", result=None)
+            expired += 1
+        return expired
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
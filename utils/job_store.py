@@ -0,0 +1,152 @@
+import os
+import abc
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.retention import RETENTION_MAX_AGE_SEC
+
+# 잡 상태: queued → running → succeeded / failed (결과 세션이 보존 정책으로 지워지면 expired)
+JOB_STORE = os.getenv("JOB_STORE", "memory")  # memory | sqlite
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join("cache", "jobs.sqlite3"))
+
+
+def _new_job(job_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "id": job_id,
+        "status": "queued",
+        "payload": payload,
+        "stages": {},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class JobStore(abc.ABC):
+    """잡 저장소 인터페이스. 구현체는 create/get/update만 제공하면 된다.
+    모두 동기 호출이므로 이벤트 루프에서는 run_io로 부른다."""
+
+    @abc.abstractmethod
+    def create(self, job_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+
+
+class InMemoryJobStore(JobStore):
+    """프로세스 메모리. 마지막 갱신 후 ttl_sec(기본 outputs 보존 기간)이 지난 잡은 지운다"""
+
+    def __init__(self, ttl_sec: float = RETENTION_MAX_AGE_SEC):
+        self.ttl_sec = ttl_sec
+        # 갱신 순서 유지 (오래된 잡이 앞쪽)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self) -> None:
+        cutoff = time.time() - self.ttl_sec
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if job["updated_at"] >= cutoff:
+                break
+            self._jobs.popitem(last=False)
+
+    def create(self, job_id, payload):
+        job = _new_job(job_id, payload)
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job_id] = job
+        return json.loads(json.dumps(job))
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(job_id)
+            # 호출자가 수정해도 저장소에 영향이 없도록 복사본 반환
+            return json.loads(json.dumps(job)) if job is not None else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            job.update(json.loads(json.dumps(fields)))
+            job["updated_at"] = time.time()
+            self._jobs.move_to_end(job_id)
+
+
+class SQLiteJobStore(JobStore):
+    """재시작 후에도 잡 상태를 조회할 수 있게 파일에 저장. 파일 하나는 프로세스 하나가 쓴다고 가정
+    - 열 때: 이전 프로세스에서 끝나지 못한 잡(queued/running)은 failed("interrupted")로
+    - 마지막 갱신 후 ttl_sec이 지난 잡은 삭제 (열 때 + 이후 EVICT_INTERVAL_SEC마다 create 시점에)"""
+
+    EVICT_INTERVAL_SEC = 3600
+
+    def __init__(self, path: str = JOB_STORE_PATH, ttl_sec: float = RETENTION_MAX_AGE_SEC):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl_sec = ttl_sec
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            # 처리하던 프로세스가 죽은 잡은 다시 실행되지 않으므로, 클라이언트가 계속 폴링하지 않게 실패로 닫는다
+            self._db.execute(
+                "UPDATE jobs SET data = json_set(data, '$.status', 'failed', '$.error', 'interrupted', "
+                "'$.stage', NULL, '$.updated_at', ?) "
+                "WHERE json_extract(data, '$.status') IN ('queued', 'running')", (time.time(),))
+            self._evict_expired()
+            self._db.commit()
+
+    def _evict_expired(self) -> None:
+        # self._lock 안에서 호출
+        self._db.execute("DELETE FROM jobs WHERE json_extract(data, '$.updated_at') < ?",
+                         (time.time() - self.ttl_sec,))
+        self._last_evict = time.time()
+
+    def create(self, job_id, payload):
+        job = _new_job(job_id, payload)
+        with self._lock:
+            if time.time() - self._last_evict >= self.EVICT_INTERVAL_SEC:
+                self._evict_expired()
+            self._db.execute("INSERT INTO jobs (id, data) VALUES (?, ?)",
+                             (job_id, json.dumps(job, ensure_ascii=False)))
+            self._db.commit()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise KeyError(job_id)
+            job = json.loads(row[0])
+            job.update(fields)
+            job["updated_at"] = time.time()
+            self._db.execute("UPDATE jobs SET data = ? WHERE id = ?",
+                             (json.dumps(job, ensure_ascii=False), job_id))
+            self._db.commit()
+
+
+def make_job_store() -> JobStore:
+    if JOB_STORE == "sqlite":
+        return SQLiteJobStore(JOB_STORE_PATH)
+    if JOB_STORE == "memory":
+        return InMemoryJobStore()
+    raise ValueError(f"지원하지 않는 JOB_STORE 입니다: {JOB_STORE}")
@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import atexit
+import logging
+import contextvars
+import logging.handlers
+from typing import Optional
+
+# 구조화(JSON) 로그 설정
+# - 핸들러는 큐에만 넣고, 실제 stdout 출력은 QueueListener 스레드가 한다 (요청 처리 중 블로킹 I/O 없음)
+# - 로그마다 request_id(요청별) / session_id(outputs/<uuid>, 잡 id)가 붙는다
+# - DEBUG 로그는 LOG_DEBUG_SAMPLE_RATE 비율만 남긴다
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+# 요청마다 INFO 로그를 남기는 라이브러리는 WARNING 이상만
+NOISY_LOGGERS = ("httpx", "httpcore", "openai", "botocore", "boto3", "urllib3", "asyncio", "multipart")
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
+
+# LogRecord 기본 속성 (나머지는 extra로 넘어온 필드)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def bind_request_id(request_id: Optional[str]) -> None:
+    _request_id.set(request_id)
+
+
+def bind_session_id(session_id: Optional[str]) -> None:
+    _session_id.set(session_id)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class _ContextFilter(logging.Filter):
+    # 큐에 넣기 전에(호출한 쪽 컨텍스트에서) 상관관계 id를 붙인다
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.session_id = _session_id.get()
+        return True
+
+
+class _DebugSampler(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 기본 구현은 traceback을 메시지에 이어 붙이므로, 메시지/예외를 따로 보존한다
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("request_id", "session_id"):
+            value = getattr(record, key, None)
+            if value:
+                out[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in out and key not in ("request_id", "session_id"):
+                out[key] = value
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s %(session_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.request_id = getattr(record, "request_id", None) or "-"
+        record.session_id = getattr(record, "session_id", None) or "-"
+        return super().format(record)
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT,
+                  debug_sample_rate: float = LOG_DEBUG_SAMPLE_RATE) -> None:
+    """루트 로거를 큐 핸들러로 교체. 여러 번 호출해도 리스너는 하나"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    q: queue.Queue = queue.Queue(-1)
+    handler = _QueueHandler(q)
+    handler.addFilter(_ContextFilter())
+    handler.addFilter(_DebugSampler(debug_sample_rate))
+
+    # 알 수 없는 이름이면 INFO (getLevelName은 "Level X" 문자열을 돌려줘서 기동이 실패했음)
+    levelno = logging.getLevelNamesMapping().get(str(level).upper())
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(levelno if levelno is not None else logging.INFO)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(root.level, logging.WARNING))
+
+    _listener = logging.handlers.QueueListener(q, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    if levelno is None:
+        logging.getLogger(__name__).warning("unknown LOG_LEVEL, using INFO", extra={"log_level": level})
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 로그를 모두 내보내고 리스너 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
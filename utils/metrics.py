@@ -0,0 +1,229 @@
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+# 단계별 지연시간 / 외부 호출 / 토큰 사용량 집계 → /metrics (Prometheus 텍스트 포맷)
+# prometheus_client 없이 필요한 Counter/Histogram만 구현 (워커 프로세스별 집계)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1KB ~ 64MB
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {v:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 → [버킷별 개수..., +Inf 개수, 합계]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * (len(self.buckets) + 2)
+            row[idx] += 1
+            row[-1] += value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            row = self._values.get(self._key(labels))
+            return sum(row[:-1]) if row else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, row in items:
+            cumulative = 0
+            labels = _fmt_labels(self.labelnames, key)
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {cumulative}")
+            cumulative += row[len(self.buckets)]
+            inf = _fmt_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {cumulative}")
+            lines.append(f"{self.name}_sum{labels} {row[-1]:g}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    return "\n".join(line for m in _registry for line in m.render()) + "\n"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "lingo_http_request_seconds", "API 요청 처리 시간", ("method", "route", "status"))
+STAGE_SECONDS = Histogram(
+    "lingo_stage_seconds", "파이프라인 단계별 처리 시간 (download/binarize/ocr/gpt/translate/...)", ("stage",))
+UPSTREAM_REQUESTS = Counter(
+    "lingo_upstream_requests_total", "외부 호출 수 (응답 상태 코드별)", ("upstream", "status"))
+UPSTREAM_RETRIES = Counter(
+    "lingo_upstream_retries_total", "외부 호출 재시도 수", ("upstream",))
+UPSTREAM_PAYLOAD_BYTES = Histogram(
+    "lingo_upstream_payload_bytes", "외부 호출 요청/응답 크기", ("upstream", "direction"), buckets=SIZE_BUCKETS)
+VISION_IMAGE_BYTES = Histogram(
+    "lingo_vision_image_bytes", "GPT 비전 입력 이미지 크기 (before=원본, after=크롭/축소/압축 후)", ("doc_type", "stage"),
+    buckets=SIZE_BUCKETS)
+OPENAI_TOKENS = Counter(
+    "lingo_openai_tokens_total", "OpenAI 토큰 사용량", ("model", "doc_type", "lang", "kind"))
+TRANSLATE_RECOVERY = Counter(
+    "lingo_translate_recovery_total",
+    "번역 배치 응답 처리 결과 (parsed=정상, repaired=잘린 JSON 복구, bisected=반으로 나눠 재요청, gave_up=원문 유지)",
+    ("tier",))
+FETCH_CACHE = Counter(
+    "lingo_fetch_cache_total", "원격 이미지 가져오기 결과 (fresh/revalidated=캐시 사용, miss=새로 받음)",
+    ("source", "result"))
+RESULT_CACHE = Counter(
+    "lingo_result_cache_total", "OCR/GPT 결과 캐시 조회 결과 (hit=재사용, miss=없음/만료)", ("result",))
+TRANSLATION_MEMORY = Counter(
+    "lingo_translation_memory_total", "번역 메모리 조회 결과 (원문 단위, hit=재사용, miss=GPT 번역 필요)", ("result",))
+PREPROCESS_WAIT_SECONDS = Histogram(
+    "lingo_preprocess_wait_seconds", "이진화 풀에 들어가기까지 대기 시간")
+PREPROCESS_REJECTED = Counter(
+    "lingo_preprocess_rejected_total", "이진화 풀 대기열이 가득 차서 거절한 페이지 수")
+
+
+# ---- 외부 호출 ----
+# 호스트 → 외부 서비스 이름 (등록되지 않은 호스트는 "http")
+_upstreams: Dict[str, str] = {}
+
+
+def register_upstream(url: str, name: str) -> None:
+    host = urlparse(url).hostname if "://" in url else url
+    if host:
+        _upstreams[host] = name
+
+
+def upstream_for(url: str) -> str:
+    return _upstreams.get(urlparse(str(url)).hostname or "", "http")
+
+
+def record_upstream(upstream: str, status, sent: Optional[int] = None, received: Optional[int] = None) -> None:
+    UPSTREAM_REQUESTS.inc(upstream=upstream, status=status)
+    if sent:
+        UPSTREAM_PAYLOAD_BYTES.observe(sent, upstream=upstream, direction="sent")
+    if received:
+        UPSTREAM_PAYLOAD_BYTES.observe(received, upstream=upstream, direction="received")
+
+
+def record_retry(upstream: str, count: int = 1) -> None:
+    UPSTREAM_RETRIES.inc(count, upstream=upstream)
+
+
+def record_openai(resp, doc_type: str = "", lang: Union[str, Sequence[str]] = "") -> None:
+    """chat.completions 응답의 상태/토큰 사용량 기록
+    lang이 여러 언어(한 번의 호출로 여러 언어 번역)면 토큰을 언어별로 나눠 더한다 (언어별 시계열 유지)"""
+    record_upstream("openai", 200)
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return
+    model = getattr(resp, "model", "") or ""
+    langs = [lang] if isinstance(lang, str) else list(lang) or [""]
+    for kind, total in (("prompt", usage.prompt_tokens or 0), ("completion", usage.completion_tokens or 0)):
+        share, rest = divmod(total, len(langs))
+        for i, name in enumerate(langs):
+            OPENAI_TOKENS.inc(share + (1 if i < rest else 0), model=model, doc_type=doc_type, lang=name, kind=kind)
+
+
+def record_openai_error(err: Exception) -> None:
+    record_upstream("openai", getattr(err, "status_code", None) or type(err).__name__)
+
+
+# ---- 요청별 Server-Timing ----
+# 미들웨어가 요청마다 리스트를 심고, timed()가 (단계, 초)를 쌓는다
+# run_cpu/run_io는 컨텍스트를 복사해서 넘기므로 스레드에서 잰 시간도 같은 요청에 모인다
+_request_timings: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def begin_request() -> list:
+    timings: list = []
+    _request_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def timed(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+def server_timing(timings: list, total: float) -> str:
+    """같은 단계는 합쳐서 표시 (페이지/배치가 동시에 돌면 합이 전체 시간보다 클 수 있다)"""
+    agg: Dict[str, List[float]] = {}
+    for stage, elapsed in timings:
+        row = agg.setdefault(stage, [0.0, 0])
+        row[0] += elapsed
+        row[1] += 1
+    parts = [f'{stage};dur={s * 1000:.1f};desc="x{n}"' for stage, (s, n) in agg.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
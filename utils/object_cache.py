@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional, Tuple
+
+from utils.disk_lru import DiskLRU, atomic_write, lazy_default
+
+# 원격 이미지(S3/HTTP) 로컬 디스크 캐시
+# - 키: sha256(URL), 저장: OBJECT_CACHE_DIR/<앞 2글자>/<키>.bin (+ <키>.json: ETag/Last-Modified/파일명)
+# - 다음 요청에서는 ETag/Last-Modified로 조건부 요청 → 바뀌지 않았으면 본문을 다시 받지 않는다
+# - OBJECT_CACHE_TRUST_SEC 이내에 받은 항목은 확인 요청도 생략 (0이면 항상 확인)
+# - 용량 초과 시 오래 안 쓴 것부터 삭제 (utils.disk_lru, 파일 mtime = 마지막 접근 시각)
+OBJECT_CACHE_ENABLED = os.getenv("OBJECT_CACHE_ENABLED", "1") != "0"
+OBJECT_CACHE_DIR = os.getenv("OBJECT_CACHE_DIR", os.path.join("cache", "objects"))
+OBJECT_CACHE_MAX_BYTES = int(os.getenv("OBJECT_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+OBJECT_CACHE_TRUST_SEC = int(os.getenv("OBJECT_CACHE_TRUST_SEC", "0"))
+
+
+class ObjectCache:
+    def __init__(self, root: str = OBJECT_CACHE_DIR, max_bytes: int = OBJECT_CACHE_MAX_BYTES,
+                 trust_sec: int = OBJECT_CACHE_TRUST_SEC):
+        self.files = DiskLRU(root, max_bytes, ".bin", companions=(".json",))
+        self.trust_sec = trust_sec
+        self.hits = 0           # 확인 없이 또는 304/ETag 일치로 캐시 사용
+        self.misses = 0         # 본문을 새로 받음
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self.files.max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        self.files.max_bytes = value
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.files.path(key), self.files.path(key, ".json")
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """저장된 검증 정보 {"etag", "last_modified", "name", "stored_at"}. 본문이 없으면 None"""
+        body, meta = self._paths(url)
+        try:
+            with open(meta, "r", encoding="utf-8") as f:
+                info = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not os.path.exists(body):
+            return None
+        return info
+
+    def is_fresh(self, info: dict) -> bool:
+        return self.trust_sec > 0 and time.time() - info.get("stored_at", 0) <= self.trust_sec
+
+    def read(self, url: str) -> Optional[bytes]:
+        body, meta = self._paths(url)
+        try:
+            with open(body, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self.files.touch(body)
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def revalidated(self, url: str) -> None:
+        """304/ETag 일치 → 확인 시각 갱신 (OBJECT_CACHE_TRUST_SEC 기준)"""
+        _, meta = self._paths(url)
+        info = self.lookup(url)
+        if info is not None:
+            info["stored_at"] = time.time()
+            atomic_write(meta, json.dumps(info).encode("utf-8"))
+
+    def put(self, url: str, data: bytes, name: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        with self._lock:
+            self.misses += 1
+        if not etag and not last_modified:
+            # 검증할 방법이 없는 응답은 저장하지 않는다
+            return
+        body, meta = self._paths(url)
+        # 검증 정보를 먼저 써 둬야 용량 초과로 본문이 바로 지워져도 .json만 남지 않는다
+        os.makedirs(os.path.dirname(meta), exist_ok=True)
+        info = {"url": url, "name": name, "etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+        atomic_write(meta, json.dumps(info).encode("utf-8"))
+        self.files.write(body, data)
+
+    def evict(self) -> int:
+        return self.files.evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self.files.total_bytes}
+
+
+# OBJECT_CACHE_ENABLED=0이면 None
+get_object_cache = lazy_default(ObjectCache, OBJECT_CACHE_ENABLED)
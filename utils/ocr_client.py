@@ -1,17 +1,27 @@
 from dotenv import load_dotenv
 import os
 import json
+import asyncio
 import time
 import uuid
 import mimetypes
 import requests
 from pathlib import Path
-from typing import Iterable, List, Union
+from typing import Iterable, List, Optional, Tuple, Union
+from utils.async_clients import get_async_http
+from utils.executors import run_io
+from utils.http_session import async_timeout, get_session, request_with_retry, timeout
+from utils.metrics import register_upstream
 
 load_dotenv()  # .env 로드
  
 INVOKE_URL = os.getenv("INVOKE_URL")         
 OCR_SECRET = os.getenv("X_OCR_SECRET")
+# 한 요청에 담을 최대 이미지 수. CLOVA General OCR은 현재 요청당 1장만 받으므로 기본값 1
+OCR_MAX_IMAGES_PER_REQUEST = int(os.getenv("OCR_MAX_IMAGES_PER_REQUEST", "1"))
+
+if INVOKE_URL:
+    register_upstream(INVOKE_URL, "clova_ocr")
 
 def _guess_format_and_mime(p: Path):
     ext = p.suffix.lower().lstrip(".") or "jpg"
@@ -23,31 +33,39 @@ def _guess_format_and_mime(p: Path):
     fmt = "jpg" if ext == "jpeg" else ext
     return fmt, mime
 
-def call_ocr(
-    image_paths: Union[str, Path, Iterable[Union[str, Path]]],
-    save_json_path: Union[str, Path],
-    timeout_sec: int = 60
-) -> dict:
+# 이미지는 파일 경로 또는 메모리 버퍼 (파일명, 바이트) 둘 다 받는다
+ImageInput = Union[str, Path, Tuple[str, bytes]]
 
-    if not INVOKE_URL or not OCR_SECRET:
-        raise RuntimeError("INVOKE_URL 또는 X-OCR-SECRET 환경변수가 비어 있습니다.")
 
+def _is_buffer(item) -> bool:
+    return isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], (bytes, bytearray))
+
+
+def _item_name(item) -> Path:
+    return Path(item[0]) if _is_buffer(item) else item
+
+
+def _to_paths(image_paths) -> list:
     # image_paths를 리스트로 변경
     if isinstance(image_paths, (str, Path)):
-        paths: List[Path] = [Path(image_paths)]
+        paths = [Path(image_paths)]
+    elif _is_buffer(image_paths):
+        paths = [image_paths]
     else:
-        paths = [Path(p) for p in image_paths]
+        paths = [p if _is_buffer(p) else Path(p) for p in image_paths]
 
     if not paths:
         raise ValueError("image_paths가 비었습니다.")
+    return paths
 
-    # message 구성
+
+def _build_message(paths: list) -> dict:
     images_meta = []
     for i, p in enumerate(paths):
-        fmt, _ = _guess_format_and_mime(p)
+        fmt, _ = _guess_format_and_mime(_item_name(p))
         images_meta.append({"format": fmt, "name": f"page-{i+1}"})
 
-    message = {
+    return {
         "version": "V2",
         "requestId": str(uuid.uuid4()),
         "timestamp": int(time.time() * 1000),
@@ -55,12 +73,37 @@ def call_ocr(
         "enableTableDetection": True,
     }
 
+
+def _save_result(result: dict, save_json_path: Union[str, Path]) -> None:
+    save_path = Path(save_json_path)
+    save_path.parent.mkdir(parents=True, exist_ok=True)
+    save_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def call_ocr(
+    image_paths: Union[ImageInput, Iterable[ImageInput]],
+    save_json_path: Optional[Union[str, Path]],
+    timeout_sec: int = 60
+) -> dict:
+
+    if not INVOKE_URL or not OCR_SECRET:
+        raise RuntimeError("INVOKE_URL 또는 X-OCR-SECRET 환경변수가 비어 있습니다.")
+
+    paths = _to_paths(image_paths)
+
+    # message 구성
+    message = _build_message(paths)
+
     # files 배열 구성
     files = []
     file_objs = []
     try:
         for p in paths:
-            fmt, mime = _guess_format_and_mime(p)
+            name = _item_name(p)
+            fmt, mime = _guess_format_and_mime(name)
+            if _is_buffer(p):
+                files.append(("file", (name.name, bytes(p[1]), mime)))
+                continue
             f = open(p, "rb")
             file_objs.append(f)
             files.append(
@@ -70,12 +113,12 @@ def call_ocr(
         headers = {"X-OCR-SECRET": OCR_SECRET}
         data = {"message": json.dumps(message, ensure_ascii=False)}
 
-        resp = requests.post(
+        resp = get_session().post(
             INVOKE_URL,
             headers=headers,
             data=data,           
             files=files,         
-            timeout=timeout_sec
+            timeout=timeout(timeout_sec)
         )
 
         if resp.status_code >= 400:
@@ -85,10 +128,8 @@ def call_ocr(
             )
 
         result = resp.json()
-
-        save_path = Path(save_json_path)
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        save_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        if save_json_path is not None:
+            _save_result(result, save_json_path)
 
         return result
 
@@ -97,4 +138,115 @@ def call_ocr(
             try:
                 f.close()
             except Exception:
-                pass
\ No newline at end of file
+                pass
+
+
+# 비동기 버전 (httpx). 파일은 메모리로 읽어 multipart로 보낸다
+async def call_ocr_async(
+    image_paths: Union[ImageInput, Iterable[ImageInput]],
+    save_json_path: Optional[Union[str, Path]],
+    timeout_sec: int = 60
+) -> dict:
+
+    if not INVOKE_URL or not OCR_SECRET:
+        raise RuntimeError("INVOKE_URL 또는 X-OCR-SECRET 환경변수가 비어 있습니다.")
+
+    paths = _to_paths(image_paths)
+    message = _build_message(paths)
+
+    files = []
+    for p in paths:
+        name = _item_name(p)
+        _, mime = _guess_format_and_mime(name)
+        data = bytes(p[1]) if _is_buffer(p) else p.read_bytes()
+        files.append(("file", (name.name, data, mime)))
+
+    resp = await request_with_retry(
+        get_async_http(), "POST", INVOKE_URL,
+        headers={"X-OCR-SECRET": OCR_SECRET},
+        data={"message": json.dumps(message, ensure_ascii=False)},
+        files=files,
+        timeout=async_timeout(timeout_sec),
+    )
+
+    if resp.status_code >= 400:
+        raise requests.HTTPError(
+            f"CLOVA OCR {resp.status_code}: {resp.text}",
+            response=None
+        )
+
+    result = resp.json()
+    if save_json_path is not None:
+        await run_io(_save_result, result, save_json_path)
+    return result
+
+
+# 여러 이미지를 담은 응답을 페이지별 OCR 결과로 분리 (각 결과는 images가 1개인 단일 요청 응답과 같은 형태)
+def split_ocr_result(result: dict, page_count: int) -> List[dict]:
+    images = result.get("images") or []
+    if len(images) != page_count:
+        raise ValueError(f"OCR 응답 이미지 수({len(images)})가 요청 페이지 수({page_count})와 다릅니다.")
+
+    # message의 name(page-1, page-2 ...) 기준으로 순서를 맞춘다
+    def page_no(img):
+        name = str(img.get("name") or "")
+        return int(name.split("-")[-1]) if name.startswith("page-") and name.split("-")[-1].isdigit() else 0
+    if all(page_no(img) for img in images):
+        images = sorted(images, key=page_no)
+
+    base = {k: v for k, v in result.items() if k != "images"}
+    return [{**base, "images": [img]} for img in images]
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# 한 문서의 페이지들을 최대 max_images장씩 묶어서 요청하고, 페이지별 JSON으로 나눠 저장
+def call_ocr_batched(
+    image_paths: Iterable[ImageInput],
+    save_json_paths: Iterable[Union[str, Path]],
+    max_images: Optional[int] = None,
+    timeout_sec: int = 60
+) -> List[dict]:
+    paths = _to_paths(image_paths)
+    save_paths = list(save_json_paths)
+    if len(save_paths) != len(paths):
+        raise ValueError("image_paths와 save_json_paths의 길이가 다릅니다.")
+
+    results: List[dict] = []
+    for chunk in _chunks(list(range(len(paths))), max_images or OCR_MAX_IMAGES_PER_REQUEST):
+        combined = call_ocr([paths[i] for i in chunk], None, timeout_sec=timeout_sec)
+        for i, page_result in zip(chunk, split_ocr_result(combined, len(chunk))):
+            _save_result(page_result, save_paths[i])
+            results.append(page_result)
+    return results
+
+
+async def call_ocr_batched_async(
+    image_paths: Iterable[ImageInput],
+    save_json_paths: Iterable[Union[str, Path]],
+    max_images: Optional[int] = None,
+    timeout_sec: int = 60
+) -> List[dict]:
+    paths = _to_paths(image_paths)
+    save_paths = list(save_json_paths)
+    if len(save_paths) != len(paths):
+        raise ValueError("image_paths와 save_json_paths의 길이가 다릅니다.")
+
+    chunks = _chunks(list(range(len(paths))), max_images or OCR_MAX_IMAGES_PER_REQUEST)
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(call_ocr_async([paths[i] for i in chunk], None, timeout_sec=timeout_sec))
+                     for chunk in chunks]
+    except* Exception as eg:
+        raise eg.exceptions[0]
+
+    results: List[dict] = [None] * len(paths)
+    for chunk, task in zip(chunks, tasks):
+        for i, page_result in zip(chunk, split_ocr_result(task.result(), len(chunk))):
+            results[i] = page_result
+    # 페이지별 JSON 저장은 IO 풀에서 (이벤트 루프를 막지 않도록)
+    await asyncio.gather(*(run_io(_save_result, r, p) for r, p in zip(results, save_paths)))
+    return results
@@ -0,0 +1,233 @@
+import os
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from utils.image_processing import binarize_image_bytes, binarize_version
+from utils.ocr_client import call_ocr_async, call_ocr_batched_async, OCR_MAX_IMAGES_PER_REQUEST
+from utils.gpt_client import call_gpt_for_structured_json_async, prompt_version as vision_prompt_version
+from utils.gpt_structure_from_ocr import (
+    call_gpt_for_structured_from_ocr_async, prompt_version as ocr_prompt_version,
+)
+from utils.s3_http_downloader import fetch_bytes, is_http_url, is_s3_url
+from utils.result_cache import get_result_cache, make_key, sha256_bytes
+from utils.executors import run_cpu, run_io
+from utils.preprocess_pool import run_preprocess
+from utils.metrics import timed
+
+# 한 요청 안에서 동시에 처리하는 페이지 수
+PAGE_CONCURRENCY = int(os.getenv("PAGE_CONCURRENCY", "4"))
+# 한 요청 안에서 동시에 받는 원본 이미지 수 (페이지 처리 한도와 별개로 모든 페이지를 미리 받아 둔다)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+# 원본/이진화 이미지를 outputs/<session>/ 에 남길지 여부 (0이면 메모리에서만 처리)
+PERSIST_INTERMEDIATES = os.getenv("PERSIST_INTERMEDIATES", "1") != "0"
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _write_json(path: str, obj) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def _is_cacheable_json(text: str) -> bool:
+    # 파싱 실패 결과({"_raw": ...})나 JSON이 아닌 응답은 캐시하지 않는다
+    try:
+        parsed = json.loads(text)
+    except Exception:
+        return False
+    return not (isinstance(parsed, dict) and "_raw" in parsed)
+
+
+async def _cache_get(key: str) -> Optional[str]:
+    cache = get_result_cache()
+    return await run_io(cache.get, key) if cache is not None else None
+
+
+async def _cache_put(key: str, text: str) -> None:
+    cache = get_result_cache()
+    if cache is not None:
+        await run_io(cache.put, key, text)
+
+
+@asynccontextmanager
+async def _no_stage(name: str):
+    yield
+
+
+def _timed_stage(stage):
+    # 단계 한도(세마포어)를 얻은 뒤부터 재므로 대기 시간은 포함되지 않는다
+    @asynccontextmanager
+    async def wrapped(name: str):
+        async with stage(name):
+            with timed(name):
+                yield
+    return wrapped
+
+
+# 다운로드 → 이진화 → (등기부: OCR) → GPT 구조화
+# stage(name)은 단계마다 감싸는 async context manager (잡 큐의 진행률/단계별 동시성 제한용)
+# OCR/GPT 결과는 원본 이미지 해시 기준으로 캐시되어, 같은 스캔을 다시 올리면 외부 호출 없이 끝난다
+async def run_structuring_pipeline(image_paths: List[str], doc_type: str, session_id: str,
+                                   output_dir: str, stage=None) -> str:
+    stage = _timed_stage(stage or _no_stage)
+    os.makedirs(output_dir, exist_ok=True)
+    # 이진화 프로필이 바뀌면 OCR/GPT 캐시도 새로 만든다
+    binarize_key = binarize_version(doc_type)
+
+    is_registry = doc_type == "부동산등기부등본"
+    # 페이지별 체인을 동시에 실행, 결과는 원래 페이지 순서로 모은다
+    # 한 페이지라도 실패하면 TaskGroup이 나머지 페이지를 취소한다
+    # 이미지는 메모리에서만 오가고, 중간 파일 저장은 PERSIST_INTERMEDIATES일 때 백그라운드로 한다
+    sem = asyncio.Semaphore(max(1, PAGE_CONCURRENCY))
+    batch_ocr = is_registry and OCR_MAX_IMAGES_PER_REQUEST > 1
+    persist_tasks = []
+    fetch_sem = asyncio.Semaphore(max(1, FETCH_CONCURRENCY))
+    downloads = {}  # 페이지 index → 다운로드 태스크 (파일명, 원본 바이트)
+    originals = {}  # 페이지 index → (파일명, 원본 바이트)
+    digests = {}    # 페이지 index → sha256(원본 바이트)
+    buffers = {}    # 페이지 index → (이진화 파일명, PNG 바이트) (GPT/배치 OCR 입력용)
+
+    def persist(path: str, data: bytes) -> None:
+        if PERSIST_INTERMEDIATES:
+            persist_tasks.append(asyncio.create_task(run_io(_write_bytes, path, data)))
+
+    def ocr_cache_key(idx: int) -> str:
+        return make_key("ocr", digests[idx], binarize_key)
+
+    async def binarize(idx: int, item: dict) -> None:
+        file_name, data = originals[idx]
+        async with stage("binarize"):
+            # 공용 전처리 풀에서 세션 단위로 번갈아 실행 (가득 차면 PreprocessBusy)
+            binary_png = await run_preprocess(session_id, binarize_image_bytes, data, doc_type)
+        binary_name = f"{file_name.split('.')[0]}_binary.png"
+        binary_path = os.path.join(output_dir, binary_name)
+        persist(binary_path, binary_png)
+        buffers[idx] = (binary_name, binary_png)
+        if PERSIST_INTERMEDIATES:
+            item["binary_image"] = binary_path
+
+    async def download(p: str):
+        async with fetch_sem:
+            async with stage("download"):
+                return await run_io(fetch_bytes, p)
+
+    async def run_pages(fn, indices) -> list:
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(fn(i)) for i in indices]
+        except* Exception as eg:
+            # 첫 번째 원인 예외를 그대로 올린다
+            raise eg.exceptions[0]
+        return [t.result() for t in tasks]
+
+    async def process_page(idx: int) -> dict:
+        p = image_paths[idx]
+        async with sem:
+            file_name, data = await downloads[idx]
+            originals[idx] = (file_name, data)
+            digests[idx] = await run_cpu(sha256_bytes, data)
+            base_name = os.path.splitext(file_name)[0]
+            if is_http_url(p) or is_s3_url(p):
+                persist(os.path.join(output_dir, file_name), data)
+
+            result_item = {
+                "original_image": p,
+                "binary_image": None,
+            }
+            if not is_registry:
+                # 가족관계/재학증명서는 GPT 캐시를 먼저 확인한 뒤에 이진화한다
+                return result_item
+
+            ocr_json_path = os.path.join(output_dir, f"{base_name}_ocr.json")
+            result_item["ocr_json_file"] = ocr_json_path
+            cached = await _cache_get(ocr_cache_key(idx))
+            if cached is not None:
+                await run_io(_write_text, ocr_json_path, cached)
+                result_item["ocr_result"] = json.loads(cached)
+                return result_item
+
+            await binarize(idx, result_item)
+            if batch_ocr:
+                # 여러 페이지를 묶어서 아래에서 한 번에 요청
+                return result_item
+            async with stage("ocr"):
+                ocr_result = await call_ocr_async(buffers[idx], ocr_json_path)
+            await _cache_put(ocr_cache_key(idx), json.dumps(ocr_result, ensure_ascii=False))
+            result_item["ocr_result"] = ocr_result
+            return result_item
+
+    try:
+        # 이미지 다운로드는 전부 먼저 시작 (원격 이미지는 utils/object_cache.py 캐시를 거친다)
+        for i, p in enumerate(image_paths):
+            downloads[i] = asyncio.create_task(download(p))
+        results = await run_pages(process_page, range(len(image_paths)))
+
+        if batch_ocr:
+            # 캐시에 없던 페이지만 OCR_MAX_IMAGES_PER_REQUEST장씩 묶어 요청 수를 ceil(N/limit)로 줄인다
+            pending = [i for i, r in enumerate(results) if "ocr_result" not in r]
+            if pending:
+                async with stage("ocr"):
+                    ocr_results = await call_ocr_batched_async(
+                        [buffers[i] for i in pending],
+                        [results[i]["ocr_json_file"] for i in pending],
+                    )
+                for i, ocr_result in zip(pending, ocr_results):
+                    results[i]["ocr_result"] = ocr_result
+                    await _cache_put(ocr_cache_key(i), json.dumps(ocr_result, ensure_ascii=False))
+
+        page_digests = [digests[i] for i in range(len(results))]
+        if is_registry:
+            gpt_key = make_key("gpt-ocr", doc_type, ocr_prompt_version(doc_type), binarize_key, *page_digests)
+            gpt_path = os.path.join(output_dir, f"{session_id}_gpt_structured.json")
+        else:
+            gpt_key = make_key("gpt-vision", doc_type, vision_prompt_version(doc_type), binarize_key, *page_digests)
+            gpt_path = os.path.join(output_dir, f"{session_id}_gpt_structured_result.json")
+        gpt_json_result = await _cache_get(gpt_key)
+
+        if gpt_json_result is None and not is_registry:
+            async def binarize_page(i: int) -> None:
+                async with sem:
+                    await binarize(i, results[i])
+            await run_pages(binarize_page, range(len(results)))
+
+        merged_path = os.path.join(output_dir, "merged_results.json")
+        await run_io(_write_json, merged_path, results)
+
+        if gpt_json_result is None:
+            if is_registry:
+                try:
+                    async with stage("gpt"):
+                        gpt_json_result = await call_gpt_for_structured_from_ocr_async(results, doc_type)
+                except Exception as e:
+                    raise RuntimeError(f"등기부 GPT 구조화 실패: {e}") from e
+            else:
+                image_paths_for_gpt = [buffers[i][1] for i in range(len(results))]
+                if not image_paths_for_gpt:
+                    raise RuntimeError("gpt 구조화를 위한 이미지가 없습니다.")
+                async with stage("gpt"):
+                    gpt_json_result = await call_gpt_for_structured_json_async(image_paths_for_gpt, doc_type)
+
+            if _is_cacheable_json(gpt_json_result):
+                await _cache_put(gpt_key, gpt_json_result)
+
+        await run_io(_write_text, gpt_path, gpt_json_result)
+
+        return gpt_path.replace("\\", "/")
+
+    finally:
+        # 다른 페이지 실패로 중단됐으면 남은 다운로드는 취소
+        for task in downloads.values():
+            task.cancel()
+        await asyncio.gather(*downloads.values(), return_exceptions=True)
+        # 백그라운드 저장이 끝난 뒤에 응답 (OCR/GPT 호출과 겹쳐서 진행됨)
+        await asyncio.gather(*persist_tasks, return_exceptions=True)
@@ -0,0 +1,196 @@
+import os
+import time
+import asyncio
+import logging
+import functools
+import contextvars
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Dict, List, Optional
+
+from utils.metrics import PREPROCESS_REJECTED, PREPROCESS_WAIT_SECONDS
+
+# 이미지 전처리(디코딩/이진화/PNG 인코딩) 전용 풀. 모든 요청/잡이 공유한다
+# - process: 코어 수만큼 워커 프로세스 (numpy 쪽 GIL 구간까지 병렬)
+# - thread: 같은 프로세스의 스레드 풀 (OpenCV 호출은 GIL을 풀어준다)
+# - 세션별 대기열을 번갈아 꺼내므로, 큰 업로드 하나가 다른 요청의 페이지를 밀어내지 못한다
+# - 대기 중인 페이지가 PREPROCESS_MAX_QUEUE를 넘으면 자리가 날 때까지 기다리고,
+#   PREPROCESS_QUEUE_TIMEOUT_SEC 안에 자리가 안 나면 PreprocessBusy (API에서는 503)
+PREPROCESS_MODE = os.getenv("PREPROCESS_MODE", "process")  # process | thread
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", str(os.cpu_count() or 2)))
+PREPROCESS_MAX_QUEUE = int(os.getenv("PREPROCESS_MAX_QUEUE", "64"))
+PREPROCESS_QUEUE_TIMEOUT_SEC = float(os.getenv("PREPROCESS_QUEUE_TIMEOUT_SEC", "30"))
+
+log = logging.getLogger(__name__)
+
+
+class PreprocessBusy(Exception):
+    """전처리 대기열이 가득 찬 상태가 제한 시간 넘게 이어짐"""
+
+
+def _init_worker() -> None:
+    # 워커마다 OpenCV 내부 스레드까지 쓰면 코어 수 이상으로 경쟁하므로 1개로 고정
+    import cv2
+    cv2.setNumThreads(1)
+
+
+class PreprocessPool:
+    def __init__(self, mode: str = PREPROCESS_MODE, workers: int = PREPROCESS_WORKERS,
+                 max_queue: int = PREPROCESS_MAX_QUEUE, queue_timeout: float = PREPROCESS_QUEUE_TIMEOUT_SEC):
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._queues: "OrderedDict[str, Deque[tuple]]" = OrderedDict()  # 세션 → 대기 중인 작업
+        self._queued = 0
+        self._running = 0
+        self._space: Deque[asyncio.Future] = deque()  # 대기열 자리를 기다리는 호출자
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                # 서버는 이미 여러 스레드가 돌고 있으므로 fork 대신 spawn
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="preprocess")
+        return self._executor
+
+    def start(self) -> None:
+        """워커를 미리 띄워 둔다 (첫 요청이 프로세스 기동 시간을 떠안지 않도록)"""
+        executor = self._get_executor()
+        if isinstance(executor, ProcessPoolExecutor):
+            try:
+                for f in [executor.submit(_init_worker) for _ in range(self.workers)]:
+                    f.result()
+            except BrokenProcessPool:
+                # 미리 띄우지 못해도 서버는 뜨게 두고, 첫 작업 때 다시 만든다
+                log.warning("preprocess workers failed to start", exc_info=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "running": self._running, "queued": self._queued,
+                "sessions": len(self._queues), "waiting": len(self._space)}
+
+    async def run(self, session: str, fn, *args):
+        """fn(*args)를 풀에서 실행. 같은 session의 작업끼리는 순서대로, 세션끼리는 번갈아 배정"""
+        t0 = time.perf_counter()
+        if self._queued >= self.max_queue:
+            await self._wait_for_space()
+
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        self._queues.setdefault(session, deque()).append((result, fn, args, t0, contextvars.copy_context()))
+        self._queued += 1
+        self._dispatch()
+        return await result
+
+    async def _wait_for_space(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._space.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            PREPROCESS_REJECTED.inc()
+            raise PreprocessBusy("이미지 전처리 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.") from None
+        finally:
+            if waiter in self._space:
+                self._space.remove(waiter)
+
+    def _wake_one(self) -> None:
+        while self._space and self._queued < self.max_queue:
+            waiter = self._space.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _next(self) -> Optional[tuple]:
+        # 맨 앞 세션에서 하나 꺼내고 그 세션은 맨 뒤로 (라운드 로빈)
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            item = queue.popleft()
+            if queue:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            self._queued -= 1
+            if not item[0].done():  # 기다리던 쪽이 취소됐으면 건너뜀
+                return item
+        return None
+
+    def _dispatch(self) -> None:
+        while self._running < self.workers:
+            item = self._next()
+            if item is None:
+                break
+            result, fn, args, t0, ctx = item
+            PREPROCESS_WAIT_SECONDS.observe(time.perf_counter() - t0)
+            try:
+                executor = self._get_executor()
+                if isinstance(executor, ProcessPoolExecutor):
+                    cf = executor.submit(fn, *args)
+                else:
+                    cf = executor.submit(functools.partial(ctx.run, fn, *args))
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = None
+                result.set_exception(e)
+                continue
+            self._running += 1
+            cf.add_done_callback(functools.partial(self._on_done, result.get_loop(), result))
+        self._wake_one()
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, result: asyncio.Future, cf) -> None:
+        # 워커 스레드/프로세스 관리 스레드에서 호출되므로 이벤트 루프로 넘긴다
+        loop.call_soon_threadsafe(self._finish, result, cf)
+
+    def _finish(self, result: asyncio.Future, cf) -> None:
+        self._running -= 1
+        error = asyncio.CancelledError() if cf.cancelled() else cf.exception()
+        if isinstance(error, BrokenProcessPool):
+            # 워커가 죽으면(메모리 부족 등) 다음 작업부터 새 풀을 만든다
+            self._executor = None
+        if not result.done():
+            if isinstance(error, asyncio.CancelledError):
+                result.cancel()
+            elif error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(cf.result())
+        self._dispatch()
+
+    def shutdown(self) -> None:
+        for waiter in self._space:
+            waiter.cancel()
+        pending: List[tuple] = [item for queue in self._queues.values() for item in queue]
+        for item in pending:
+            item[0].cancel()
+        self._queues.clear()
+        self._queued = 0
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool = PreprocessPool()
+
+
+async def run_preprocess(session: str, fn, *args):
+    return await _pool.run(session, fn, *args)
+
+
+def start_preprocess_pool() -> None:
+    _pool.start()
+
+
+def preprocess_stats() -> Dict[str, int]:
+    return _pool.stats()
+
+
+def shutdown_preprocess_pool() -> None:
+    _pool.shutdown()
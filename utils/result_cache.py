@@ -0,0 +1,84 @@
+import os
+import hashlib
+import threading
+from typing import Optional
+
+from utils.disk_lru import DiskLRU, lazy_default
+from utils.metrics import RESULT_CACHE
+
+# 내용 해시 기반 결과 캐시 (OCR JSON / GPT 구조화 JSON)
+# - 키: sha256(원본 이미지 바이트) + doc_type + 프롬프트/전처리 버전
+# - 저장: RESULT_CACHE_DIR/<앞 2글자>/<키>.json, 파일 mtime = 마지막 접근 시각
+# - 만료: RESULT_CACHE_TTL_SEC, 용량 초과 시 오래 안 쓴 것부터 삭제 (utils.disk_lru)
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join("cache", "results"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+RESULT_CACHE_TTL_SEC = int(os.getenv("RESULT_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root: str = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 ttl_sec: int = RESULT_CACHE_TTL_SEC):
+        self.files = DiskLRU(root, max_bytes, ".json", ttl_sec=ttl_sec)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self.files.max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        self.files.max_bytes = value
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._read(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        RESULT_CACHE.inc(result="miss" if text is None else "hit")
+        return text
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self.files.path(key)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        if self.files.is_expired(st.st_mtime):
+            self.files.remove(path, st.st_size)
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        self.files.touch(path)
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self.files.write(self.files.path(key), text.encode("utf-8"))
+
+    def evict(self) -> int:
+        return self.files.evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "bytes": self.files.total_bytes}
+
+
+# RESULT_CACHE_ENABLED=0이면 None
+get_result_cache = lazy_default(ResultCache, RESULT_CACHE_ENABLED)
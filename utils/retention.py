@@ -0,0 +1,148 @@
+import os
+import sys
+import time
+import shutil
+import asyncio
+import logging
+import argparse
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.executors import run_io
+
+# outputs/<session>/ 보존 정책
+# - 마지막 접근(세션 디렉터리 mtime)이 RETENTION_MAX_AGE_SEC보다 오래되면 삭제
+# - 전체 용량이 RETENTION_MAX_BYTES를 넘으면 오래 안 쓴 세션부터 90%까지 삭제 (LRU)
+# - 방금 만들어진/사용된 세션(RETENTION_MIN_AGE_SEC 이내)은 처리 중일 수 있으므로 건드리지 않는다
+# 세션 파일을 다시 읽는 요청은 touch_session()으로 접근 시각을 갱신한다
+OUTPUTS_DIR = os.getenv("OUTPUTS_DIR", "outputs")
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "1") != "0"
+RETENTION_MAX_AGE_SEC = int(os.getenv("RETENTION_MAX_AGE_SEC", str(3 * 24 * 3600)))
+RETENTION_MAX_BYTES = int(os.getenv("RETENTION_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))
+RETENTION_MIN_AGE_SEC = int(os.getenv("RETENTION_MIN_AGE_SEC", "600"))
+RETENTION_INTERVAL_SEC = int(os.getenv("RETENTION_INTERVAL_SEC", "900"))
+
+log = logging.getLogger(__name__)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    else:
+                        total += e.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    pass
+    return total
+
+
+def touch_session(path: str, root: str = OUTPUTS_DIR) -> None:
+    """outputs/<session>/... 경로면 해당 세션의 마지막 접근 시각을 갱신"""
+    if not path:
+        return
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+    session = rel.split(os.sep)[0]
+    if rel.startswith("..") or session in ("", "."):
+        return
+    try:
+        os.utime(os.path.join(root, session))
+    except FileNotFoundError:
+        pass
+
+
+def _sessions(root: str) -> List[Tuple[float, int, str]]:
+    out = []
+    if not os.path.isdir(root):
+        return out
+    with os.scandir(root) as it:
+        for e in it:
+            if not e.is_dir(follow_symlinks=False):
+                continue
+            try:
+                mtime = e.stat(follow_symlinks=False).st_mtime
+            except FileNotFoundError:
+                continue
+            out.append((mtime, _dir_size(e.path), e.path))
+    return out
+
+
+def sweep(root: str = OUTPUTS_DIR, max_age_sec: int = RETENTION_MAX_AGE_SEC,
+          max_bytes: int = RETENTION_MAX_BYTES, min_age_sec: int = RETENTION_MIN_AGE_SEC,
+          dry_run: bool = False, removed_sessions: Optional[List[str]] = None) -> Dict[str, int]:
+    """만료 → LRU 순으로 세션 디렉터리를 지우고 결과를 돌려준다
+    removed_sessions: 주면 지운 세션 id(디렉터리 이름)를 여기에 추가"""
+    now = time.time()
+    # mtime 오름차순이므로 만료된 세션이 앞쪽에 모인다
+    sessions = sorted(_sessions(root))
+    total = sum(size for _, size, _ in sessions)
+    # 용량 정리는 RETENTION_MAX_BYTES를 넘었을 때만 시작해서 90%까지 (매 주기 조금씩 지우지 않도록)
+    target = int(max_bytes * 0.9) if total > max_bytes else total
+    removed = reclaimed = 0
+    for mtime, size, path in sessions:
+        age = now - mtime
+        if age <= max_age_sec and total - reclaimed <= target:
+            break
+        if age < min_age_sec:
+            # 이후 세션은 더 최근이므로 모두 보호 대상
+            break
+        if not dry_run:
+            shutil.rmtree(path, ignore_errors=True)
+            if removed_sessions is not None:
+                removed_sessions.append(os.path.basename(path))
+        removed += 1
+        reclaimed += size
+    return {
+        "sessions": len(sessions),
+        "removed": removed,
+        "reclaimed_bytes": reclaimed,
+        "remaining_bytes": total - reclaimed,
+    }
+
+
+async def run_retention_sweeper(interval_sec: Optional[int] = None,
+                                on_removed: Optional[Callable[[List[str]], Awaitable[int]]] = None) -> None:
+    """lifespan에서 태스크로 띄우고, 종료 시 cancel
+    on_removed(지운 세션 id 목록): 세션을 결과로 가리키던 기록(잡 등)을 만료 처리"""
+    interval = interval_sec or RETENTION_INTERVAL_SEC
+    while True:
+        try:
+            removed: List[str] = []
+            report = await run_io(sweep, removed_sessions=removed)
+            if report["removed"]:
+                log.info("outputs sessions removed", extra=report)
+            if removed and on_removed is not None:
+                expired = await on_removed(removed)
+                if expired:
+                    log.info("jobs expired with their outputs", extra={"jobs": expired})
+        except Exception:
+            # 정리 실패로 서버가 죽지 않도록, 다음 주기에 다시 시도
+            log.exception("retention sweep failed")
+        await asyncio.sleep(interval)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="outputs/ 세션 디렉터리 정리")
+    parser.add_argument("--root", default=OUTPUTS_DIR)
+    parser.add_argument("--max-age", type=int, default=RETENTION_MAX_AGE_SEC, help="초")
+    parser.add_argument("--max-bytes", type=int, default=RETENTION_MAX_BYTES)
+    parser.add_argument("--min-age", type=int, default=RETENTION_MIN_AGE_SEC, help="초, 이보다 최근 세션은 보존")
+    parser.add_argument("--dry-run", action="store_true", help="지우지 않고 대상만 집계")
+    args = parser.parse_args(argv)
+
+    report = sweep(args.root, args.max_age, args.max_bytes, args.min_age, dry_run=args.dry_run)
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}removed {report['removed']}/{report['sessions']} sessions, "
+          f"reclaimed {report['reclaimed_bytes']} bytes, remaining {report['remaining_bytes']} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
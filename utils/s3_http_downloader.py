@@ -1,12 +1,43 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 from urllib.parse import urlparse, unquote
 
 import boto3
-import requests
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from utils.http_session import get_session, timeout, HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+from utils.metrics import FETCH_CACHE, record_retry, record_upstream
+from utils.object_cache import get_object_cache
 
-__all__ = ["ensure_local", "is_http_url", "is_s3_url"]
+__all__ = ["ensure_local", "fetch_bytes", "is_http_url", "is_s3_url"]
+
+# 로컬 S3 대역(moto 서버, MinIO 등)으로 돌릴 때만 지정
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+# 큰 스캔 다운로드: 첫 GET은 CHUNK만큼 받고, 객체가 더 크면 나머지를 CHUNK 단위로 MAX_CONCURRENCY개 스레드가 병렬로
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "8"))
+
+s3 = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL, config=Config(
+    max_pool_connections=HTTP_POOL_SIZE,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT,
+    retries={"max_attempts": 5, "mode": "standard"},
+))
+
+
+def _record_s3_call(http_response=None, parsed=None, **kwargs):
+    if http_response is not None:
+        size = http_response.headers.get("content-length")
+        record_upstream("s3", http_response.status_code, received=int(size) if size and size.isdigit() else None)
+    # botocore가 내부에서 재시도한 횟수
+    retries = ((parsed or {}).get("ResponseMetadata") or {}).get("RetryAttempts") or 0
+    if retries:
+        record_retry("s3", retries)
+
+
+s3.meta.events.register("after-call.s3", _record_s3_call)
 
-s3 = boto3.client("s3")
 
 def is_http_url(p: str) -> bool:
     return p.startswith("http://") or p.startswith("https://")
@@ -14,49 +45,149 @@ def is_http_url(p: str) -> bool:
 def is_s3_url(p: str) -> bool:
     return p.startswith("s3://")
 
-def download_http(url: str, out_dir: str) -> str:
-    os.makedirs(out_dir, exist_ok=True)
-    parsed = urlparse(url)
-    base = unquote(os.path.basename(parsed.path)) or "image"
+def _name_from_url(url: str, content_type: str = "") -> str:
+    base = unquote(os.path.basename(urlparse(url).path)) or "image"
     name, ext = os.path.splitext(base)
-
-    r = requests.get(url, stream=True, timeout=30)
-    r.raise_for_status()
-
     if not ext:
-        ct = r.headers.get("Content-Type", "")
-        if "jpeg" in ct:
+        if "jpeg" in content_type:
             ext = ".jpg"
-        elif "png" in ct:
+        elif "png" in content_type:
             ext = ".png"
-        elif "webp" in ct:
+        elif "webp" in content_type:
             ext = ".webp"
         else:
             ext = ".bin"
+    return f"{name}{ext}"
+
+
+def _fetch_http(url: str) -> Tuple[str, bytes]:
+    cache = get_object_cache()
+    info = cache.lookup(url) if cache is not None else None
+    if info is not None and cache.is_fresh(info):
+        data = cache.read(url)
+        if data is not None:
+            FETCH_CACHE.inc(source="http", result="fresh")
+            return info["name"], data
+
+    # 캐시에 있으면 조건부 요청 → 304면 본문 없이 끝
+    headers = {}
+    if info is not None:
+        if info.get("etag"):
+            headers["If-None-Match"] = info["etag"]
+        if info.get("last_modified"):
+            headers["If-Modified-Since"] = info["last_modified"]
+    with get_session().get(url, headers=headers, timeout=timeout(30)) as r:
+        if r.status_code == 304 and info is not None:
+            data = cache.read(url)
+            if data is not None:
+                cache.revalidated(url)
+                FETCH_CACHE.inc(source="http", result="revalidated")
+                return info["name"], data
+            # 그 사이 본문이 지워졌으면 조건 없이 다시 받는다
+            return _fetch_http_uncached(url)
+        r.raise_for_status()
+        name, data = _name_from_url(url, r.headers.get("Content-Type", "")), r.content
+        if cache is not None:
+            cache.put(url, data, name, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        FETCH_CACHE.inc(source="http", result="miss")
+        return name, data
 
-    local = os.path.join(out_dir, f"{name}{ext}")
-    with open(local, "wb") as f:
-        for chunk in r.iter_content(8192):
-            if chunk:
-                f.write(chunk)
-    return local
 
-#s3://bucket/key 를 로컬 파일로 다운로드
-def download_s3_url(s3_url: str, out_dir: str) -> str:
-   
+def _fetch_http_uncached(url: str) -> Tuple[str, bytes]:
+    with get_session().get(url, timeout=timeout(30)) as r:
+        r.raise_for_status()
+        name, data = _name_from_url(url, r.headers.get("Content-Type", "")), r.content
+    cache = get_object_cache()
+    if cache is not None:
+        cache.put(url, data, name, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    FETCH_CACHE.inc(source="http", result="miss")
+    return name, data
+
+
+def _s3_get(bucket: str, key: str, etag: Optional[str] = None) -> Optional[Tuple[bytes, Optional[str]]]:
+    """
+    GET 한 번으로 확인과 다운로드를 같이 한다 (HEAD를 따로 보내지 않음)
+    - etag가 있으면 IfNoneMatch → 같으면 304, None 반환
+    - 첫 요청은 앞 CHUNK 범위만. Content-Range로 전체 크기를 알고, 남은 범위는 IfMatch(같은 버전)로 병렬 요청
+    (본문, ETag) 반환
+    """
+    conditional = {"IfNoneMatch": etag} if etag else {}
+    try:
+        resp = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{S3_MULTIPART_CHUNKSIZE - 1}", **conditional)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if code in ("304", "NotModified"):
+            return None
+        if code != "InvalidRange":
+            raise
+        # 빈 객체는 범위 요청이 416
+        resp = s3.get_object(Bucket=bucket, Key=key, **conditional)
+    head = resp["Body"].read()
+    etag = resp.get("ETag")
+    content_range = resp.get("ContentRange") or ""
+    total = int(content_range.rsplit("/", 1)[1]) if "/" in content_range else len(head)
+    if total <= len(head):
+        return head, etag
+
+    same_version = {"IfMatch": etag} if etag else {}
+
+    def part(start: int) -> bytes:
+        end = min(start + S3_MULTIPART_CHUNKSIZE, total) - 1
+        return s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", **same_version)["Body"].read()
+
+    starts = range(len(head), total, S3_MULTIPART_CHUNKSIZE)
+    with ThreadPoolExecutor(max_workers=max(1, min(S3_MAX_CONCURRENCY, len(starts))),
+                            thread_name_prefix="s3-range") as ex:
+        return head + b"".join(ex.map(part, starts)), etag
+
+
+def _fetch_s3(s3_url: str) -> Tuple[str, bytes]:
+    parsed = urlparse(s3_url)
+    bucket, key = parsed.netloc, parsed.path.lstrip("/")
+    name = os.path.basename(key) or "image"
+    cache = get_object_cache()
+    info = cache.lookup(s3_url) if cache is not None else None
+    if info is not None and cache.is_fresh(info):
+        data = cache.read(s3_url)
+        if data is not None:
+            FETCH_CACHE.inc(source="s3", result="fresh")
+            return info["name"], data
+
+    # 캐시에 있으면 조건부 GET (ETag가 같으면 304, 본문 없음), 없으면 바로 GET
+    cached_etag = info.get("etag") if info is not None else None
+    fetched = _s3_get(bucket, key, cached_etag)
+    if fetched is None:
+        data = cache.read(s3_url)
+        if data is not None:
+            cache.revalidated(s3_url)
+            FETCH_CACHE.inc(source="s3", result="revalidated")
+            return info["name"], data
+        # 검증 정보만 남고 본문이 사라진 경우
+        fetched = _s3_get(bucket, key)
+    data, etag = fetched
+    if cache is not None:
+        cache.put(s3_url, data, name, etag)
+    FETCH_CACHE.inc(source="s3", result="miss")
+    return name, data
+
+
+def ensure_local(path_or_url: str, out_dir: str) -> str:
+    if not (is_http_url(path_or_url) or is_s3_url(path_or_url)):
+        return path_or_url
+    name, data = fetch_bytes(path_or_url)
     os.makedirs(out_dir, exist_ok=True)
-    parsed = urlparse(s3_url)  
-    bucket = parsed.netloc
-    key = parsed.path.lstrip("/")
-    base = os.path.basename(key) or "image"
-    local = os.path.join(out_dir, base)
-    s3.download_file(bucket, key, local)
+    local = os.path.join(out_dir, name)
+    with open(local, "wb") as f:
+        f.write(data)
     return local
 
 
-def ensure_local(path_or_url: str, out_dir: str) -> str:
+# 디스크를 거치지 않고 (파일명, 바이트)로 가져오기 (인메모리 파이프라인용)
+# 원격 이미지는 로컬 객체 캐시를 거친다 (utils/object_cache.py)
+def fetch_bytes(path_or_url: str) -> Tuple[str, bytes]:
     if is_http_url(path_or_url):
-        return download_http(path_or_url, out_dir)
+        return _fetch_http(path_or_url)
     if is_s3_url(path_or_url):
-        return download_s3_url(path_or_url, out_dir)
-    return path_or_url
\ No newline at end of file
+        return _fetch_s3(path_or_url)
+    with open(path_or_url, "rb") as f:
+        return os.path.basename(path_or_url), f.read()
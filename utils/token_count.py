@@ -0,0 +1,93 @@
+import os
+import re
+import math
+import logging
+import functools
+import threading
+from typing import Optional
+
+# 번역 배치 크기 계산용 토큰 수
+# - tiktoken이 설치돼 있으면 실제 토크나이저 사용 (TOKENIZER_ENCODING, gpt-4o 계열은 o200k_base)
+# - 없으면 문자 종류별 추정치: 한글/한자는 글자당 1토큰 이상, 영문은 4글자, 숫자는 3자리당 1토큰.
+#   실제보다 조금 크게 잡아서 배치가 출력 한도를 넘지 않도록 한다
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")
+# 인코딩 파일 로딩(캐시에 없으면 다운로드)을 처음 쓰는 요청이 기다리는 최대 시간
+TOKENIZER_LOAD_TIMEOUT_SEC = float(os.getenv("TOKENIZER_LOAD_TIMEOUT_SEC", "5"))
+
+log = logging.getLogger(__name__)
+
+_HANGUL = re.compile(r"[가-힣ᄀ-ᇿ㄰-㆏]")
+_HANJA = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+_LATIN_RUN = re.compile(r"[A-Za-z]+")
+_DIGIT_RUN = re.compile(r"\d+")
+_OTHER = re.compile(r"[^\sA-Za-z\d가-힣ᄀ-ᇿ㄰-㆏㐀-䶿一-鿿豈-﫿]")
+
+
+_encoding = None
+_fallback_reason = "not loaded yet"
+_loader: Optional[threading.Thread] = None
+_loader_lock = threading.Lock()
+
+
+def _load_encoding() -> None:
+    """백그라운드 스레드에서 실행. 인코딩 파일이 TIKTOKEN_CACHE_DIR에 없으면 tiktoken이 내려받는다
+    (Docker 이미지는 빌드 때 받아 둔다)"""
+    global _encoding, _fallback_reason
+    try:
+        import tiktoken
+    except ImportError:
+        _fallback_reason = "tiktoken not installed"
+    else:
+        try:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            _fallback_reason = None
+            # 로딩 전에 추정치로 세어 둔 값은 버린다
+            count_tokens.cache_clear()
+        except Exception as e:
+            # 인코딩 파일을 받을 수 없는 오프라인 환경
+            _fallback_reason = f"encoding {TOKENIZER_ENCODING} unavailable: {e}"
+    if _encoding is not None:
+        log.info("token counter ready", extra={"tokenizer": tokenizer_name()})
+    else:
+        log.warning("token counter falls back to heuristic estimate",
+                    extra={"tokenizer": tokenizer_name(), "reason": _fallback_reason})
+
+
+def warm_tokenizer() -> threading.Thread:
+    """인코딩 로딩을 백그라운드로 시작 (여러 번 불러도 한 번). import/기동을 막지 않고, 끝나면 결과를 로그로 남긴다"""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = threading.Thread(target=_load_encoding, name="tokenizer-load", daemon=True)
+            _loader.start()
+        return _loader
+
+
+def _get_encoding():
+    # 처음 쓰는 쪽만 TOKENIZER_LOAD_TIMEOUT_SEC까지 기다리고, 그 뒤로는 로딩이 끝날 때까지 추정치
+    loader = _loader
+    if loader is None:
+        warm_tokenizer().join(TOKENIZER_LOAD_TIMEOUT_SEC)
+    return _encoding
+
+
+def tokenizer_name() -> str:
+    return TOKENIZER_ENCODING if _encoding is not None else "heuristic"
+
+
+def _estimate(text: str) -> int:
+    tokens = len(_HANGUL.findall(text)) + math.ceil(1.2 * len(_HANJA.findall(text)))
+    tokens += sum(math.ceil(len(m) / 4) for m in _LATIN_RUN.findall(text))
+    tokens += sum(math.ceil(len(m) / 3) for m in _DIGIT_RUN.findall(text))
+    tokens += len(_OTHER.findall(text))
+    return max(1, tokens)
+
+
+@functools.lru_cache(maxsize=65536)
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return _estimate(text)
@@ -1,20 +1,45 @@
 import os
 import re
 import json
+import math
 import time
+import hashlib
+import threading
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from zipfile import ZipFile
-from typing import Any, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import openai
 from dotenv import load_dotenv
+from utils.translation_memory import get_translation_memory
+from utils.token_count import count_tokens
+from utils.clean_gpt_response import clean_gpt_response
+from utils.metrics import TRANSLATE_RECOVERY, record_openai, record_openai_error, record_retry, timed
 
 load_dotenv()
 
 openai.api_key = os.getenv("OPENAI_API_KEY") or os.getenv("GPT-API-KEY")
 
+log = logging.getLogger(__name__)
+
 
 OPENAI_MODEL = os.getenv("TRANSLATE_MODEL", "gpt-4o-mini")
-MAX_CHARS = int(os.getenv("TRANSLATE_BATCH_MAX_CHARS", "4000"))
+# 배치 크기는 토큰 기준 (utils/token_count.py): 보내는 값들의 토큰 합과, 돌아올 번역의 예상 토큰 합을 모두 제한
+# 한국어 → 영어 등은 번역문이 원문보다 토큰이 많아서, 출력 한도를 넘기면 JSON이 잘려 값별 폴백으로 떨어진다
+MAX_INPUT_TOKENS = int(os.getenv("TRANSLATE_BATCH_MAX_INPUT_TOKENS", "1500"))
+MAX_OUTPUT_TOKENS = int(os.getenv("TRANSLATE_BATCH_MAX_OUTPUT_TOKENS", "3000"))
+# 원문 1토큰당 예상 번역 토큰 수
+OUTPUT_TOKEN_RATIO = float(os.getenv("TRANSLATE_OUTPUT_TOKEN_RATIO", "2.0"))
+# 응답 형식을 JSON schema(structured outputs)로 강제. 지원하지 않는 모델/게이트웨이면 0
+STRUCTURED_OUTPUT = os.getenv("TRANSLATE_STRUCTURED_OUTPUT", "1") != "0"
+# 값 하나당 JSON 배열 오버헤드 ("", 쉼표)
+_VALUE_OVERHEAD_TOKENS = 3
+# 동시에 보낼 수 있는 최대 배치 수 (1이면 기존처럼 순차 처리)
+MAX_CONCURRENCY = int(os.getenv("TRANSLATE_MAX_CONCURRENCY", "4"))
+# 번역 메모리 사용 여부
+USE_TRANSLATION_MEMORY = os.getenv("TRANSLATE_USE_MEMORY", "1") != "0"
 
 SYSTEM_TMPL = (
     "당신은 공증문서 번역가입니다.\n"
@@ -28,6 +53,23 @@ SYSTEM_TMPL = (
     
     "- 결과는 오직 JSON만 반환: {{\"values\": [ ... ]}}\n"
 )
+# 프롬프트가 바뀌면 번역 메모리 키도 바뀌도록 버전으로 사용
+PROMPT_VERSION = os.getenv("TRANSLATE_PROMPT_VERSION") or hashlib.sha256(SYSTEM_TMPL.encode("utf-8")).hexdigest()[:12]
+
+# 여러 언어를 한 번에 (/translate-multi combined 모드). 규칙은 SYSTEM_TMPL과 같다
+MULTI_SYSTEM_TMPL = (
+    "당신은 공증문서 번역가입니다.\n"
+    "주어진 values 배열의 문자열을 각각 다음 언어들로 번역하세요: {langs}\n"
+    "- 가족관계증명서에 있는 한자는 절대 번역하지 마세요\n"
+    "- 원본에 있는 한자는 **한글로 번역이나 치환하지 말고** 그대로 가져오세요.\n"
+    "- 본관(originOfSurname) **제발 한문 그대로** 가져오세요.\n"
+    "- 숫자/날짜/식별자는 번역하지 말 것\n"
+    "- 입력과 같은 순서/개수로, 값마다 언어 이름을 key로 하는 객체를 만드세요\n"
+    "- 결과는 오직 JSON만 반환: {{\"values\": [{{\"<언어>\": \"<번역>\", ...}}, ...]}}\n"
+)
+# combined 모드 번역은 다른 프롬프트의 결과이므로 번역 메모리에서 단일 언어 결과와 섞이지 않게 따로 버전을 둔다
+MULTI_PROMPT_VERSION = (os.getenv("TRANSLATE_MULTI_PROMPT_VERSION")
+                        or "multi-" + hashlib.sha256(MULTI_SYSTEM_TMPL.encode("utf-8")).hexdigest()[:12])
 
 # 숫자/날짜/식별자 스킵 패턴
 _NUMERIC_LIKE = re.compile(r"^\s*[\d\-\./:,\s]+$")        
@@ -66,106 +108,547 @@ def _inject_strings(root: Any, pairs: List[Tuple[Tuple, str]]) -> None:
         cur[path[-1]] = val
 
 
-def _make_batches(items: List[Tuple[Tuple, str]], max_chars: int = None) -> List[List[Tuple[Tuple, str]]]:
-    if max_chars is None:
-        max_chars = MAX_CHARS
-    batches, cur, cur_len = [], [], 0
+def _make_batches(items: List[Tuple[Tuple, str]], max_input_tokens: int = None,
+                  max_output_tokens: int = None, output_ratio: float = None) -> List[List[Tuple[Tuple, str]]]:
+    """입력/예상 출력 토큰 한도 안에서 순서대로 채운다. 한도보다 큰 값 하나는 단독 배치
+    output_ratio: 원문 1토큰당 예상 출력 토큰 (여러 언어를 한 번에 받으면 언어 수만큼 곱한다)"""
+    if max_input_tokens is None:
+        max_input_tokens = MAX_INPUT_TOKENS
+    if max_output_tokens is None:
+        max_output_tokens = MAX_OUTPUT_TOKENS
+    if output_ratio is None:
+        output_ratio = OUTPUT_TOKEN_RATIO
+    batches, cur, cur_in, cur_out = [], [], 0, 0
     for it in items:
-        add = len(it[1]) + 10
-        if cur and cur_len + add > max_chars:
+        n = count_tokens(it[1])
+        add_in = n + _VALUE_OVERHEAD_TOKENS
+        add_out = math.ceil(n * output_ratio) + _VALUE_OVERHEAD_TOKENS
+        if cur and (cur_in + add_in > max_input_tokens or cur_out + add_out > max_output_tokens):
             batches.append(cur)
-            cur, cur_len = [], 0
+            cur, cur_in, cur_out = [], 0, 0
         cur.append(it)
-        cur_len += add
+        cur_in += add_in
+        cur_out += add_out
     if cur:
         batches.append(cur)
     return batches
 
 
-def _call_openai_with_retry(messages, max_retries=5, initial_wait=2):
+class _AdaptiveLimiter:
+    """
+    모든 번역 호출이 공유하는 동시 실행 한도.
+    - 429를 받으면 한도를 절반으로 줄이고, 공용 대기 시간(cooldown)을 건다
+    - 성공이 한도만큼 누적되면 한도를 1씩 되돌린다 (최대 max_limit)
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._cooldown_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                wait = self._cooldown_until - time.monotonic()
+                if wait <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self.limit < self.max_limit and self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_rate_limited(self, wait: float) -> None:
+        with self._cond:
+            now = time.monotonic()
+            # 같은 cooldown 구간에 동시에 들어온 429는 한 번만 반영
+            if now >= self._cooldown_until:
+                self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self._cooldown_until = max(self._cooldown_until, now + wait)
+
+
+_limiter = _AdaptiveLimiter(MAX_CONCURRENCY)
+
+
+class _Usage:
+    """한 작업(언어별 번역 등)이 쓴 호출 수/토큰 합계. 배치/재시도 스레드에서 함께 더한다"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, resp) -> None:
+        usage = getattr(resp, "usage", None)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "prompt_tokens": self.prompt_tokens,
+                    "completion_tokens": self.completion_tokens}
+
+
+# 설정돼 있으면 성공한 호출의 usage를 여기에 더한다 (translate_multi 리포트용)
+_usage_sink: contextvars.ContextVar[Optional[_Usage]] = contextvars.ContextVar("translate_usage", default=None)
+
+
+_client: Optional[openai.OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> openai.OpenAI:
+    # SDK 자체 재시도(기본 2회)는 끈다: 429 재시도/대기는 _call_openai_with_retry와 _limiter만
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = openai.OpenAI(api_key=openai.api_key, max_retries=0)
+        return _client
+
+
+def _call_openai_with_retry(messages, max_retries=5, initial_wait=2, lang="", response_format=None):
     wait = initial_wait
     last_err = None
     for i in range(max_retries):
+        _limiter.acquire()
         try:
-            return openai.chat.completions.create(
+            kwargs = {"response_format": response_format} if response_format else {}
+            resp = _get_client().chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=messages,
                 temperature=0,
+                **kwargs,
             )
+            _limiter.on_success()
+            record_openai(resp, lang=lang)
+            sink = _usage_sink.get()
+            if sink is not None:
+                sink.add(resp)
+            return resp
         except openai.RateLimitError as e:
             last_err = e
+            record_openai_error(e)
             msg = str(e).lower()
             if "insufficient_quota" in msg:
                 raise RuntimeError("OpenAI 쿼터 부족(insufficient_quota)") from e
             if i == max_retries - 1:
                 raise
-            time.sleep(wait)
+            # 개별 sleep 대신 공용 한도를 줄이고 cooldown 동안 모든 호출을 대기시킨다
+            _limiter.on_rate_limited(wait)
+            record_retry("openai")
             wait = min(wait * 2, 20)
+            continue
+        except openai.BadRequestError as e:
+            # 요청 자체가 잘못된 경우는 다시 보내도 같다
+            record_openai_error(e)
+            raise
         except openai.APIError as e:
             last_err = e
+            record_openai_error(e)
             if i == max_retries - 1:
                 raise
-            time.sleep(wait)
-            wait = min(wait * 2, 20)
+        finally:
+            _limiter.release()
+        record_retry("openai")
+        time.sleep(wait)
+        wait = min(wait * 2, 20)
     if last_err:
         raise last_err
 
 
-def _translate_batch(values: List[str], lang: str) -> List[str]:
-    system_prompt = SYSTEM_TMPL.format(lang=lang)
-    user_payload = json.dumps({"values": values}, ensure_ascii=False)
+_VALUES_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "translated_values",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"values": {"type": "array", "items": {"type": "string"}}},
+            "required": ["values"],
+            "additionalProperties": False,
+        },
+    },
+}
+_decoder = json.JSONDecoder()
 
-    resp = _call_openai_with_retry([
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": [{"type": "text", "text": user_payload}]}
-    ])
-    text = (resp.choices[0].message.content or "").strip()
 
-    # JSON 파싱
+def _multi_schema(langs: List[str]) -> dict:
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "translated_values_multi",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {"values": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {lang: {"type": "string"} for lang in langs},
+                    "required": list(langs),
+                    "additionalProperties": False,
+                }}},
+                "required": ["values"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _parse_values(text: str) -> Tuple[List[Any], bool]:
+    """응답에서 values 배열을 꺼낸다. (항목들, 완전한 JSON이었는지)
+    길이 초과로 잘린 응답이면 끝까지 닫힌 항목(문자열/객체)들만 앞에서부터 살린다"""
+    text = clean_gpt_response(text)
     try:
         data = json.loads(text)
         if isinstance(data, dict) and isinstance(data.get("values"), list):
-            return [str(x) for x in data["values"]]
-        raise ValueError("unexpected shape")
-    except Exception:
-        # 폴백
-        out = []
-        for v in values:
-            one = json.dumps({"values": [v]}, ensure_ascii=False)
-            r = _call_openai_with_retry([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": [{"type": "text", "text": one}]}
-            ])
-            t = (r.choices[0].message.content or "").strip()
-            try:
-                d = json.loads(t)
-                out.append(str(d["values"][0]))
-            except Exception:
-                out.append(v) 
+            return data["values"], True
+        return [], False
+    except ValueError:
+        pass
+
+    m = re.search(r'"values"\s*:\s*\[', text)
+    if not m:
+        return [], False
+    out, i = [], m.end()
+    while True:
+        while i < len(text) and text[i] in " \t\r\n,":
+            i += 1
+        if i >= len(text) or text[i] not in '"{':
+            break
+        try:
+            value, i = _decoder.raw_decode(text, i)
+        except ValueError:
+            break  # 마지막 항목이 중간에 잘림
+        out.append(value)
+    return out, False
+
+
+def _request(messages, lang, response_format: dict) -> Tuple[List[Any], bool]:
+    """lang: 언어 하나, 또는 한 번에 받는 언어 목록 (토큰 사용량을 언어별로 나눠 기록)"""
+    global STRUCTURED_OUTPUT
+    try:
+        resp = _call_openai_with_retry(
+            messages, lang=lang, response_format=response_format if STRUCTURED_OUTPUT else None)
+    except openai.BadRequestError as e:
+        if not STRUCTURED_OUTPUT or "response_format" not in str(e):
+            raise
+        # json_schema를 지원하지 않는 모델이면 이후로는 끄고 일반 응답으로 다시
+        log.warning("structured outputs not supported, falling back to plain JSON", extra={"model": OPENAI_MODEL})
+        STRUCTURED_OUTPUT = False
+        resp = _call_openai_with_retry(messages, lang=lang)
+    return _parse_values(resp.choices[0].message.content or "")
+
+
+def _request_values(values: List[str], lang: str) -> Tuple[List[Any], bool]:
+    user_payload = json.dumps({"values": values}, ensure_ascii=False)
+    return _request([
+        {"role": "system", "content": SYSTEM_TMPL.format(lang=lang)},
+        {"role": "user", "content": [{"type": "text", "text": user_payload}]}
+    ], lang, _VALUES_SCHEMA)
+
+
+def _request_multi(values: List[str], langs: List[str]) -> Tuple[List[Any], bool]:
+    user_payload = json.dumps({"values": values, "languages": list(langs)}, ensure_ascii=False)
+    return _request([
+        {"role": "system", "content": MULTI_SYSTEM_TMPL.format(langs=", ".join(langs))},
+        {"role": "user", "content": [{"type": "text", "text": user_payload}]}
+    ], list(langs), _multi_schema(langs))
+
+
+def _is_context_length_error(e: openai.BadRequestError) -> bool:
+    """입력/출력 토큰 한도 초과 400인지 (나눠 보내면 되는 경우). 그 외 400은 설정 오류라 그대로 올린다"""
+    if getattr(e, "code", None) == "context_length_exceeded":
+        return True
+    msg = str(e).lower()
+    return "maximum context length" in msg or "too many tokens" in msg or "context_length_exceeded" in msg
+
+
+def _translate_with_recovery(values: List[str], request, accept, keep_source) -> List[Any]:
+    """
+    한 배치 번역. 응답이 어긋나도 값마다 한 번씩 다시 부르지 않는다
+    - 개수가 맞으면 그대로 (parsed)
+    - 잘린 JSON이면 닫힌 앞부분만 쓰고 나머지만 다시 요청 (repaired)
+    - 그 외(개수 불일치/파싱 실패/컨텍스트 길이 초과)는 반으로 나눠 두 쪽을 동시에 재요청 (bisected)
+    - 값 하나도 실패하면 원문 유지 (gave_up)
+    request(values) → (항목들, 완전한지), accept(항목) → 쓸 수 있는 항목인지, keep_source(원문) → 실패 시 값
+    """
+    if not values:
+        return []
+    try:
+        items, complete = request(values)
+    except openai.BadRequestError as e:
+        # 컨텍스트 길이 초과만 나눠서 다시 (값 하나짜리면 원문 유지)
+        # 모델명/파라미터 오류 등은 나눠도 같은 400이므로 호출한 쪽까지 올려서 500으로 드러나게 한다
+        if not _is_context_length_error(e):
+            raise
+        items, complete = [], False
+
+    # 앞에서부터 쓸 수 있는 항목까지만
+    out = []
+    for item in items[:len(values)]:
+        if not accept(item):
+            break
+        out.append(item)
+
+    if len(items) == len(values) and len(out) == len(values):
+        TRANSLATE_RECOVERY.inc(tier="parsed")
         return out
+    if not complete and 0 < len(out) < len(values):
+        TRANSLATE_RECOVERY.inc(tier="repaired")
+        return out + _translate_with_recovery(values[len(out):], request, accept, keep_source)
+    if len(values) == 1:
+        TRANSLATE_RECOVERY.inc(tier="gave_up")
+        return [keep_source(values[0])]
+
+    TRANSLATE_RECOVERY.inc(tier="bisected")
+    mid = len(values) // 2
+    ctx = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="translate-bisect") as ex:
+        left = ex.submit(ctx.run, _translate_with_recovery, values[:mid], request, accept, keep_source)
+        right = _translate_with_recovery(values[mid:], request, accept, keep_source)
+        return left.result() + right
+
+
+def _translate_batch(values: List[str], lang: str) -> List[str]:
+    return _translate_with_recovery(
+        values, lambda vs: _request_values(vs, lang), lambda x: isinstance(x, str), lambda v: v)
+
+
+def _translate_batch_multi(values: List[str], langs: List[str]) -> List[dict]:
+    """값마다 {언어: 번역문}. 한 번의 호출로 모든 언어를 받는다"""
+    return _translate_with_recovery(
+        values, lambda vs: _request_multi(vs, langs),
+        lambda x: isinstance(x, dict) and all(isinstance(x.get(lang), str) for lang in langs),
+        lambda v: {lang: v for lang in langs})
+
+
+def _translate_batches(batches: List[List[Tuple[Tuple, str]]], lang,
+                       max_workers: int = None, on_batch=None, translate=None) -> List[Tuple[Tuple, str]]:
+    """배치들을 동시에 번역하고 (path, 번역값) 쌍으로 되돌린다. 실제 API 동시성은 _limiter가 제한.
+    on_batch가 있으면 배치가 끝나는 순서대로 그 배치의 (path, 번역값) 목록을 넘긴다
+    translate(값들, lang): 기본은 _translate_batch (여러 언어를 한 번에 받을 때는 _translate_batch_multi)"""
+    if translate is None:
+        translate = _translate_batch
+    if max_workers is None:
+        max_workers = MAX_CONCURRENCY
+    max_workers = max(1, min(max_workers, len(batches)))
+
+    def run(batch):
+        tr_vals = translate([v for _, v in batch], lang)
+        return [(path, tv) for (path, _), tv in zip(batch, tr_vals)]
+
+    if max_workers == 1:
+        results = []
+        for b in batches:
+            results.append(run(b))
+            if on_batch is not None:
+                on_batch(results[-1])
+    else:
+        # 요청별 타이밍 등 호출한 쪽의 contextvars를 배치 스레드에도 넘긴다
+        ctx = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate") as ex:
+            futures = [ex.submit(ctx.copy().run, run, b) for b in batches]
+            if on_batch is not None:
+                for f in as_completed(futures):
+                    on_batch(f.result())
+            results = [f.result() for f in futures]
+
+    translated_pairs: List[Tuple[Tuple, str]] = []
+    for r in results:
+        translated_pairs.extend(r)
+    return translated_pairs
+
+
+def _translate_pairs(pairs: List[Tuple[Tuple, str]], lang: str, max_workers: int = None,
+                     on_batch=None) -> List[Tuple[Tuple, str]]:
+    """(path, 원문) → (path, 번역문). 번역 메모리에 있는 원문은 바로 채우고, 없는 것만 배치로 보낸다
+    on_batch(번역된 (path, 번역문) 목록): 번역 메모리 결과 한 번 + 배치가 끝날 때마다 호출 (스트리밍용)"""
+    cached = {}
+    tm = get_translation_memory() if USE_TRANSLATION_MEMORY else None
+    if tm is not None:
+        with timed("translation_memory"):
+            cached = tm.get_many((v for _, v in pairs), lang, OPENAI_MODEL, PROMPT_VERSION)
+    translated_pairs = [(path, cached[v]) for path, v in pairs if v in cached]
+    misses = [(path, v) for path, v in pairs if v not in cached]
+    if on_batch is not None and translated_pairs:
+        on_batch(translated_pairs)
+
+    if misses:
+        # 문서 안에서 같은 원문은 한 번만 보내고 결과를 모든 경로에 나눠 준다
+        unique = list(dict.fromkeys(v for _, v in misses))
+        batches = _make_batches([(v, v) for v in unique])
+        fan_out = None
+        if on_batch is not None:
+            paths_by_value = {}
+            for path, v in misses:
+                paths_by_value.setdefault(v, []).append(path)
+
+            def fan_out(done):
+                on_batch([(path, tv) for v, tv in done for path in paths_by_value[v]])
+        with timed("translate"):
+            fresh = dict(_translate_batches(batches, lang, max_workers=max_workers, on_batch=fan_out))
+        translated_pairs.extend((path, fresh[v]) for path, v in misses)
+        if tm is not None:
+            # 원문 그대로 돌아온 값(폴백 실패 포함)은 저장하지 않는다
+            tm.put_many(((v, tv) for v, tv in fresh.items() if tv != v), lang, OPENAI_MODEL, PROMPT_VERSION)
+    return translated_pairs
+
 
 #JSON 문자열을 로드 → value들만 번역 → JSON 문자열로 반환
-def _translate_json_text(json_text: str, lang: str) -> str:
+def _translate_json_text(json_text: str, lang: str, max_workers: int = None, on_batch=None) -> str:
     root = json.loads(json_text)
     pairs = _collect_strings(root)
+    if on_batch is not None:
+        on_batch([], len(pairs))
     if not pairs:
         return json.dumps(root, ensure_ascii=False, indent=2)
 
-    batches = _make_batches(pairs, max_chars=MAX_CHARS)
-    translated_pairs: List[Tuple[Tuple, str]] = []
+    progress = (lambda done: on_batch(done, len(pairs))) if on_batch is not None else None
+    _inject_strings(root, _translate_pairs(pairs, lang, max_workers=max_workers, on_batch=progress))
+    return json.dumps(root, ensure_ascii=False, indent=2)
 
-    for batch in batches:
-        vals = [v for _, v in batch]
-        tr_vals = _translate_batch(vals, lang)
-        translated_pairs.extend([(path, tv) for (path, _), tv in zip(batch, tr_vals)])
 
-    _inject_strings(root, translated_pairs)
-    return json.dumps(root, ensure_ascii=False, indent=2)
+def _get_path(root: Any, path: Tuple) -> Any:
+    cur = root
+    for p in path:
+        try:
+            cur = cur[p]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return cur
+
+
+def diff_strings(base_source: Any, base_translated: Any, edited: Any) -> Tuple[List, List]:
+    """경로별로 이전 원문과 비교 → (재사용할 (path, 이전 번역문), 새로 번역할 (path, 원문))"""
+    base = dict(_collect_strings(base_source))
+    reused, changed = [], []
+    for path, value in _collect_strings(edited):
+        previous = _get_path(base_translated, path)
+        if base.get(path) == value and isinstance(previous, str):
+            reused.append((path, previous))
+        else:
+            changed.append((path, value))
+    return reused, changed
+
+
+def translate_incremental(base_source: Any, base_translated: Any, edited: Any, lang: str,
+                          max_workers: int = None) -> Tuple[str, dict]:
+    """수정된 원문 중 바뀐 값만 번역하고 나머지는 이전 번역을 그대로 쓴다. (번역 JSON 문자열, 통계) 반환"""
+    root = json.loads(json.dumps(edited))
+    reused, changed = diff_strings(base_source, base_translated, root)
+    translated = _translate_pairs(changed, lang, max_workers=max_workers) if changed else []
+    _inject_strings(root, reused + translated)
+    stats = {"reused": len(reused), "translated": len(changed)}
+    log.debug("incremental translate", extra={"lang": lang, **stats})
+    return json.dumps(root, ensure_ascii=False, indent=2), stats
+
+
+def _translate_pairs_multi(pairs: List[Tuple[Tuple, str]], langs: List[str],
+                           max_workers: int = None) -> Dict[str, List[Tuple[Tuple, str]]]:
+    """한 번의 호출로 모든 언어를 받는다. 언어별 번역 메모리(MULTI_PROMPT_VERSION)에 모두 있는 값은 보내지 않는다"""
+    values = list(dict.fromkeys(v for _, v in pairs))
+    tm = get_translation_memory() if USE_TRANSLATION_MEMORY else None
+    cached = {lang: {} for lang in langs}
+    if tm is not None:
+        with timed("translation_memory"):
+            for lang in langs:
+                cached[lang] = tm.get_many(values, lang, OPENAI_MODEL, MULTI_PROMPT_VERSION)
+    missing = [v for v in values if any(v not in cached[lang] for lang in langs)]
+
+    fresh: Dict[str, dict] = {}
+    if missing:
+        batches = _make_batches([(v, v) for v in missing], output_ratio=OUTPUT_TOKEN_RATIO * len(langs))
+        with timed("translate"):
+            fresh = dict(_translate_batches(batches, list(langs), max_workers=max_workers,
+                                            translate=_translate_batch_multi))
+        if tm is not None:
+            for lang in langs:
+                tm.put_many(((v, tr[lang]) for v, tr in fresh.items() if tr[lang] != v),
+                            lang, OPENAI_MODEL, MULTI_PROMPT_VERSION)
+
+    out = {}
+    for lang in langs:
+        by_value = {v: cached[lang][v] if v in cached[lang] else fresh[v][lang] for v in values}
+        out[lang] = [(path, by_value[v]) for path, v in pairs]
+    return out
+
+
+def translate_multi(json_text: str, langs: List[str], combined: bool = False,
+                    max_workers: int = None) -> Tuple[Dict[str, str], dict]:
+    """
+    같은 문서를 여러 언어로. 문자열 수집/중복 제거는 한 번만 하고
+    - 기본: 언어별 번역을 동시에 실행 (API 동시성은 공용 _limiter가 제한)
+    - combined: 값마다 모든 언어를 한 번의 호출로 받음 (호출 수 1/N, 대신 응답이 길다)
+    ({언어: 번역 JSON 문자열}, 리포트) 반환. 리포트에는 언어별/전체 호출 수, 토큰, 지연시간
+    """
+    langs = list(dict.fromkeys(langs))
+    root = json.loads(json_text)
+    pairs = _collect_strings(root)
+    report = {"mode": "combined" if combined else "per_language", "strings": len(pairs),
+              "unique": len(set(v for _, v in pairs)), "languages": {}}
+
+    def render(translated: List[Tuple[Tuple, str]]) -> str:
+        out = json.loads(json.dumps(root))
+        _inject_strings(out, translated)
+        return json.dumps(out, ensure_ascii=False, indent=2)
+
+    t0 = time.perf_counter()
+    total = _Usage()
+    if combined:
+        def run_combined():
+            _usage_sink.set(total)
+            return _translate_pairs_multi(pairs, langs, max_workers=max_workers) if pairs else {}
+
+        translated = contextvars.copy_context().run(run_combined)
+        results = {lang: render(translated.get(lang, [])) for lang in langs}
+    else:
+        def run(lang: str):
+            usage = _Usage()
+            _usage_sink.set(usage)
+            started = time.perf_counter()
+            text = render(_translate_pairs(pairs, lang, max_workers=max_workers) if pairs else [])
+            return text, {"latency_ms": round((time.perf_counter() - started) * 1000, 1), **usage.as_dict()}
+
+        # 언어마다 별도 컨텍스트 (usage 집계가 섞이지 않도록)
+        ctx = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, len(langs)), thread_name_prefix="translate-lang") as ex:
+            futures = {lang: ex.submit(ctx.copy().run, run, lang) for lang in langs}
+            results = {}
+            for lang, f in futures.items():
+                results[lang], report["languages"][lang] = f.result()
+        for lang_report in report["languages"].values():
+            total.calls += lang_report["calls"]
+            total.prompt_tokens += lang_report["prompt_tokens"]
+            total.completion_tokens += lang_report["completion_tokens"]
+
+    report["total"] = {"latency_ms": round((time.perf_counter() - t0) * 1000, 1), **total.as_dict()}
+    if combined:
+        # 호출을 언어끼리 나눠 쓰므로 언어별로는 지연시간만 (모두 같은 값)
+        report["languages"] = {lang: {"latency_ms": report["total"]["latency_ms"]} for lang in langs}
+    log.debug("multi-language translate", extra={"langs": langs, "mode": report["mode"], **report["total"]})
+    return results, report
 
 
-def call_gpt_for_translate_json(json_path: str, lang: str) -> str:
-    print(f"[DEBUG] 요청받은 JSON 경로: {json_path}")
+def call_gpt_for_translate_json(json_path: str, lang: str, on_batch=None) -> str:
+    """on_batch(번역된 (path, 번역문) 목록, 전체 문자열 수): 시작할 때 빈 목록으로 한 번, 이후 배치마다"""
+    log.debug("translate request", extra={"json_path": json_path, "lang": lang})
     p = Path(json_path) 
     json_text = p.read_text(encoding="utf-8-sig")
 
-    return _translate_json_text(json_text, lang)
\ No newline at end of file
+    return _translate_json_text(json_text, lang, on_batch=on_batch)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.metrics import TRANSLATION_MEMORY
+
+# 번역 메모리 (원문, 대상 언어, 모델, 프롬프트 버전) → 번역문
+# - 메모리: LRU (TRANSLATION_MEMORY_SIZE 개)
+# - 디스크: SQLite 파일 (TRANSLATION_MEMORY_PATH, 빈 값이면 메모리만 사용)
+TM_PATH = os.getenv("TRANSLATION_MEMORY_PATH", os.path.join("cache", "translation_memory.sqlite3"))
+TM_SIZE = int(os.getenv("TRANSLATION_MEMORY_SIZE", "20000"))
+
+
+def make_key(source: str, lang: str, model: str, prompt_version: str) -> str:
+    raw = "\x1f".join([prompt_version, model, lang, source])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    def __init__(self, path: Optional[str] = TM_PATH, max_items: int = TM_SIZE):
+        self.max_items = max(1, max_items)
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tm ("
+                " key TEXT PRIMARY KEY, lang TEXT, model TEXT, prompt_version TEXT,"
+                " source TEXT, target TEXT)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, target: str) -> None:
+        self._lru[key] = target
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def get_many(self, sources: Iterable[str], lang: str, model: str,
+                 prompt_version: str) -> Dict[str, str]:
+        """찾은 원문만 {원문: 번역문}으로 반환. 못 찾은 원문은 misses로 집계."""
+        found: Dict[str, str] = {}
+        pending: Dict[str, str] = {}
+        with self._lock:
+            for s in set(sources):
+                key = make_key(s, lang, model, prompt_version)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[s] = self._lru[key]
+                else:
+                    pending[key] = s
+
+            if pending and self._db is not None:
+                keys = list(pending)
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, target FROM tm WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, target in rows:
+                        found[pending.pop(key)] = target
+                        self._remember(key, target)
+
+            self.hits += len(found)
+            self.misses += len(pending)
+        if found:
+            TRANSLATION_MEMORY.inc(len(found), result="hit")
+        if pending:
+            TRANSLATION_MEMORY.inc(len(pending), result="miss")
+        return found
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], lang: str, model: str,
+                 prompt_version: str) -> None:
+        rows = []
+        with self._lock:
+            for source, target in pairs:
+                key = make_key(source, lang, model, prompt_version)
+                self._remember(key, target)
+                rows.append((key, lang, model, prompt_version, source, target))
+            if rows and self._db is not None:
+                self._db.executemany("INSERT OR REPLACE INTO tm VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "memory_items": len(self._lru)}
+
+
+_default: Optional[TranslationMemory] = None
+_default_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = TranslationMemory()
+        return _default
@@ -0,0 +1,48 @@
+import os
+import json
+import uuid
+import shutil
+from typing import Any, Optional
+
+from utils.retention import OUTPUTS_DIR, touch_session
+
+# 번역 결과를 증분 재번역의 기준으로 쓰기 위한 기록
+# - translation_id = 번역 세션 id (outputs/<translation_id>/)
+# - translation.json: {"lang", "source": 원문 스냅샷 파일명, "result": 번역 결과 파일명}
+TRANSLATION_META = "translation.json"
+TRANSLATION_SOURCE = "translation_source.json"
+
+
+def save_translation(output_dir: str, result_path: str, lang: str, source_path: Optional[str] = None,
+                     source: Any = None) -> str:
+    """번역에 쓴 원문(파일 또는 객체)을 세션 폴더에 복사해 두고 translation_id 반환"""
+    snapshot = os.path.join(output_dir, TRANSLATION_SOURCE)
+    if source_path is not None:
+        shutil.copyfile(source_path, snapshot)
+    else:
+        with open(snapshot, "w", encoding="utf-8") as f:
+            json.dump(source, f, ensure_ascii=False)
+    meta = {"lang": lang, "source": TRANSLATION_SOURCE, "result": os.path.basename(result_path)}
+    with open(os.path.join(output_dir, TRANSLATION_META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return os.path.basename(os.path.normpath(output_dir))
+
+
+def load_translation(translation_id: str, root: str = OUTPUTS_DIR) -> Optional[dict]:
+    """{"lang", "source", "result"} (source/result는 JSON 객체). 없거나 정리됐으면 None"""
+    try:
+        uuid.UUID(translation_id)  # 경로 조작 방지: 세션 id 형식만 허용
+    except (ValueError, TypeError):
+        return None
+    session_dir = os.path.join(root, translation_id)
+    try:
+        with open(os.path.join(session_dir, TRANSLATION_META), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(session_dir, meta["source"]), "r", encoding="utf-8-sig") as f:
+            source = json.load(f)
+        with open(os.path.join(session_dir, meta["result"]), "r", encoding="utf-8") as f:
+            result = json.load(f)
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+    touch_session(session_dir, root)
+    return {"lang": meta.get("lang"), "source": source, "result": result}
@@ -0,0 +1,102 @@
+import os
+import math
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+# GPT 비전 입력 전처리: 문서 영역 크롭 → 모델 타일 해상도로 축소 → 압축 인코딩
+VISION_PREPROCESS = os.getenv("VISION_PREPROCESS", "1") != "0"
+# 모든 문서 유형에 강제로 적용할 포맷 (png1 | png | webp | jpeg). 비우면 문서별 프로필 사용
+VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "")
+
+# 문서 유형별 프로필
+# - max_long/max_short: gpt-4o high detail은 2048 안으로 맞춘 뒤 짧은 변을 768로 줄이므로 그 이상은 토큰 낭비
+# - format: png1(1비트 PNG) / webp / jpeg, quality는 webp/jpeg에만 사용
+# - 가족관계증명서는 한자 획이 뭉개지지 않도록 회색조 PNG 유지
+VISION_PROFILES: Dict[str, dict] = {
+    "가족관계증명서": {"max_long": 2048, "max_short": 768, "crop": True, "format": "png", "quality": 85},
+    "재학증명서": {"max_long": 2048, "max_short": 768, "crop": True, "format": "png1", "quality": 80},
+}
+DEFAULT_PROFILE = {"max_long": 2048, "max_short": 768, "crop": True, "format": "png1", "quality": 80}
+
+_MIME = {"png1": "image/png", "png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """gpt-4o high detail 기준 이미지 토큰 추정 (85 + 170 * 512px 타일 수)"""
+    if width <= 0 or height <= 0:
+        return 0
+    scale = min(1.0, 2048 / max(width, height))
+    w, h = width * scale, height * scale
+    scale = min(1.0, 768 / min(w, h))
+    w, h = w * scale, h * scale
+    return 85 + 170 * math.ceil(w / 512) * math.ceil(h / 512)
+
+
+def _crop_to_content(gray: np.ndarray, margin: int = 16) -> np.ndarray:
+    # 글자(어두운 픽셀)가 있는 영역의 bounding box로 자른다
+    coords = cv2.findNonZero((gray < 128).astype(np.uint8))
+    if coords is None:
+        return gray
+    x, y, w, h = cv2.boundingRect(coords)
+    x0, y0 = max(0, x - margin), max(0, y - margin)
+    x1, y1 = min(gray.shape[1], x + w + margin), min(gray.shape[0], y + h + margin)
+    return gray[y0:y1, x0:x1]
+
+
+def _resize(gray: np.ndarray, max_long: int, max_short: int) -> np.ndarray:
+    h, w = gray.shape[:2]
+    scale = min(1.0, max_long / max(h, w), max_short / min(h, w))
+    if scale >= 1.0:
+        return gray
+    return cv2.resize(gray, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def _encode(gray: np.ndarray, fmt: str, quality: int) -> bytes:
+    if fmt == "png1":
+        # 축소하면서 생긴 회색을 다시 0/255로 → 1비트 PNG
+        _, bw = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
+        ok, buf = cv2.imencode(".png", bw, [cv2.IMWRITE_PNG_BILEVEL, 1, cv2.IMWRITE_PNG_COMPRESSION, 9])
+    elif fmt == "png":
+        ok, buf = cv2.imencode(".png", gray, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+    elif fmt == "webp":
+        ok, buf = cv2.imencode(".webp", gray, [cv2.IMWRITE_WEBP_QUALITY, quality])
+    elif fmt == "jpeg":
+        ok, buf = cv2.imencode(".jpg", gray, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    else:
+        raise ValueError(f"지원하지 않는 이미지 포맷입니다: {fmt}")
+    if not ok:
+        raise RuntimeError("이미지 인코딩 실패")
+    return buf.tobytes()
+
+
+def prepare_vision_image(data: bytes, doc_type: str) -> Tuple[bytes, str, dict]:
+    """이미지 바이트 → (전처리된 바이트, MIME, 절감 통계)"""
+    profile = dict(VISION_PROFILES.get(doc_type, DEFAULT_PROFILE))
+    if VISION_IMAGE_FORMAT:
+        profile["format"] = VISION_IMAGE_FORMAT
+
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError("이미지를 불러올 수 없습니다.")
+    orig_h, orig_w = gray.shape[:2]
+
+    if profile["crop"]:
+        cropped = _crop_to_content(gray)
+        # 가늘고 긴 영역으로 잘리면 타일 수가 오히려 늘 수 있으므로, 토큰이 줄지 않으면 크롭하지 않는다
+        if estimate_image_tokens(cropped.shape[1], cropped.shape[0]) <= estimate_image_tokens(orig_w, orig_h):
+            gray = cropped
+    gray = _resize(gray, profile["max_long"], profile["max_short"])
+    out = _encode(gray, profile["format"], profile["quality"])
+
+    h, w = gray.shape[:2]
+    stats = {
+        "bytes_before": len(data),
+        "bytes_after": len(out),
+        "size_before": [orig_w, orig_h],
+        "size_after": [w, h],
+        "tokens_before": estimate_image_tokens(orig_w, orig_h),
+        "tokens_after": estimate_image_tokens(w, h),
+    }
+    return out, _MIME[profile["format"]], stats